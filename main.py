@@ -2,24 +2,31 @@ import sys
 import os
 import random
 import hashlib
+import functools
+import heapq
+import itertools
 import pandas as pd
 import numpy as np
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import warnings
 from typing import List, Dict, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from collections import OrderedDict
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QComboBox, QPushButton, QCheckBox, QLineEdit, QTabWidget,
     QTableWidget, QTableWidgetItem, QGroupBox, QSplitter, QScrollArea,
+    QTableView, QAbstractItemView,
     QMenuBar, QMenu, QDialog, QTextEdit, QProgressBar, QFileDialog,
     QMessageBox, QGridLayout, QFrame, QSizePolicy, QSpinBox, QTextBrowser
 )
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QAbstractTableModel, QModelIndex
 from PyQt6.QtGui import QAction, QFont, QColor, QIcon
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
@@ -53,6 +60,246 @@ class FilterCondition:
     value: Any
     logic: LogicOperator = LogicOperator.AND
 
+@dataclass
+class FilterGroup:
+    """Группа условий в скобках: элементы связываются одним оператором"""
+    logic: LogicOperator = LogicOperator.AND
+    items: List[Any] = field(default_factory=list)
+    
+    def __len__(self):
+        """Число условий во всем дереве"""
+        return sum(len(item) if isinstance(item, FilterGroup) else 1 for item in self.items)
+    
+    @classmethod
+    def from_conditions(cls, conditions: List[FilterCondition]) -> 'FilterGroup':
+        """Плоский список условий в дерево с приоритетом AND над OR (как в SQL)"""
+        or_items = []
+        current = []
+        for condition in conditions:
+            if condition.logic == LogicOperator.OR:
+                or_items.append(cls(LogicOperator.AND, current))
+                current = [condition]
+            else:
+                current.append(condition)
+        if not or_items:
+            return cls(LogicOperator.AND, current)
+        return cls(LogicOperator.OR, or_items + [cls(LogicOperator.AND, current)])
+
+# ДАТЫ КОНКУРСНЫХ СПИСКОВ
+class ListDate:
+    """Дата списка: в базе - целый номер дня от 1 января года кампании
+    (порядок номеров совпадает с хронологическим), в интерфейсе и именах
+    файлов - ДД.ММ"""
+    
+    # Год приемной кампании для дат без года (ДД.ММ)
+    CAMPAIGN_YEAR = 2025
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def to_key(value) -> int:
+        """ДД.ММ, ДД.ММ.ГГГГ, ГГГГ-ММ-ДД или номер дня -> номер дня"""
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+        text = str(value).strip()
+        parsed = None
+        for date_format in ('%Y-%m-%d', '%d.%m.%Y'):
+            try:
+                parsed = datetime.strptime(text, date_format)
+                break
+            except ValueError:
+                pass
+        if parsed is None:
+            try:
+                parsed = datetime.strptime(f"{text}.{ListDate.CAMPAIGN_YEAR}", '%d.%m.%Y')
+            except ValueError:
+                raise ValueError(f"Некорректная дата списка: {value}") from None
+        return (parsed - datetime(ListDate.CAMPAIGN_YEAR, 1, 1)).days
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def to_label(value) -> str:
+        """Номер дня -> ДД.ММ (год добавляется, если он не год кампании)"""
+        if not isinstance(value, (int, np.integer)):
+            return value
+        day = datetime(ListDate.CAMPAIGN_YEAR, 1, 1) + timedelta(days=int(value))
+        if day.year == ListDate.CAMPAIGN_YEAR:
+            return day.strftime('%d.%m')
+        return day.strftime('%d.%m.%Y')
+
+# КОМПИЛЯЦИЯ ФИЛЬТРОВ В SQL И NUMPY-МАСКИ
+class FilterCompiler:
+    """Дерево фильтров -> параметризованный SQL (план кэшируется по форме
+    выражения) или булева маска колоночного снимка"""
+    
+    OPERATORS = ("=", ">", "<", ">=", "<=", "!=", "IN", "BETWEEN")
+    
+    @staticmethod
+    def normalize(filters) -> FilterGroup:
+        """Список FilterCondition, одно условие или группа -> FilterGroup"""
+        if filters is None:
+            return FilterGroup()
+        if isinstance(filters, FilterGroup):
+            return filters
+        if isinstance(filters, FilterCondition):
+            return FilterGroup(items=[filters])
+        return FilterGroup.from_conditions(list(filters))
+    
+    @classmethod
+    def validate(cls, condition: FilterCondition):
+        """Проверка поля и оператора по белым спискам"""
+        if condition.field not in EnhancedDatabase.APPLICANT_COLUMNS:
+            raise ValueError(f"Недопустимое поле фильтра: {condition.field}")
+        if condition.operator not in cls.OPERATORS:
+            raise ValueError(f"Неподдерживаемый оператор фильтра: {condition.operator}")
+        if condition.operator == "BETWEEN" and (
+                not isinstance(condition.value, (list, tuple)) or len(condition.value) != 2):
+            raise ValueError("Для BETWEEN нужна пара значений (от, до)")
+    
+    @staticmethod
+    def values(condition: FilterCondition) -> list:
+        """Значения условия (для IN - список, для BETWEEN - границы); даты - номера дней"""
+        if condition.operator in ("IN", "BETWEEN"):
+            if isinstance(condition.value, (list, tuple, set)):
+                values = list(condition.value)
+            else:
+                values = [condition.value]
+        else:
+            values = [condition.value]
+        if condition.field == "list_date":
+            values = [ListDate.to_key(value) for value in values]
+        return values
+    
+    @classmethod
+    def value(cls, condition: FilterCondition):
+        """Значение условия для сравнения на снимке"""
+        values = cls.values(condition)
+        return values if condition.operator in ("IN", "BETWEEN") else values[0]
+    
+    @classmethod
+    def shape(cls, node):
+        """Форма выражения без значений - ключ кэша скомпилированного SQL"""
+        if isinstance(node, FilterGroup):
+            return ('group', node.logic.value, tuple(cls.shape(item) for item in node.items))
+        cls.validate(node)
+        count = len(cls.values(node)) if node.operator == "IN" else None
+        return ('condition', node.field, node.operator, count)
+    
+    @classmethod
+    def parameters(cls, node, params: list = None) -> list:
+        """Значения параметров в порядке следования в SQL"""
+        params = [] if params is None else params
+        if isinstance(node, FilterGroup):
+            for item in node.items:
+                cls.parameters(item, params)
+        else:
+            params.extend(cls.values(node))
+        return params
+    
+    @classmethod
+    def fields(cls, node) -> set:
+        """Поля, на которые ссылается дерево фильтров"""
+        if isinstance(node, FilterGroup):
+            return set().union(*(cls.fields(item) for item in node.items))
+        return {node.field}
+    
+    @classmethod
+    def to_sql(cls, filters):
+        """Условие WHERE с плейсхолдерами и список параметров"""
+        tree = cls.normalize(filters)
+        return cls._sql_for_shape(cls.shape(tree)), cls.parameters(tree)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _sql_for_shape(shape) -> str:
+        kind = shape[0]
+        if kind == 'condition':
+            _, field_name, operator, count = shape
+            if operator == "IN":
+                return f"{field_name} IN ({', '.join('?' * count)})"
+            if operator == "BETWEEN":
+                return f"{field_name} BETWEEN ? AND ?"
+            return f"{field_name} {operator} ?"
+        
+        _, logic, items = shape
+        if not items:
+            # Пустая группа: AND - истина, OR - ложь
+            return "1=1" if logic == "AND" else "0=1"
+        if len(items) == 1:
+            return FilterCompiler._sql_for_shape(items[0])
+        return "(" + f" {logic} ".join(FilterCompiler._sql_for_shape(item) for item in items) + ")"
+    
+    @classmethod
+    def to_mask(cls, filters, snapshot) -> np.ndarray:
+        """Булева маска дерева фильтров на колоночном снимке"""
+        return cls._node_mask(cls.normalize(filters), snapshot)
+    
+    @classmethod
+    def _node_mask(cls, node, snapshot) -> np.ndarray:
+        if not isinstance(node, FilterGroup):
+            cls.validate(node)
+            return snapshot.condition_mask(node)
+        if node.logic == LogicOperator.OR:
+            mask = np.zeros(len(snapshot), dtype=bool)
+            for item in node.items:
+                mask |= cls._node_mask(item, snapshot)
+        else:
+            mask = np.ones(len(snapshot), dtype=bool)
+            for item in node.items:
+                mask &= cls._node_mask(item, snapshot)
+        return mask
+
+@dataclass
+class PassScoreResult:
+    """Результат расчета проходного балла по одной программе и дате"""
+    pass_score: Optional[int]
+    total_applications: int
+    priority_counts: List[int] = field(default_factory=lambda: [0, 0, 0, 0])
+    admitted_counts: List[int] = field(default_factory=lambda: [0, 0, 0, 0])
+
+@dataclass
+class RejectedRow:
+    """Строка CSV файла, не прошедшая проверку при загрузке"""
+    row: int
+    external_id: Any
+    reason: str
+    # Нарушенное правило проверки (type, consent, range, priority, sum, duplicate)
+    rule: str = ""
+    # Исходные значения колонок строки через запятую
+    raw: str = ""
+
+@dataclass
+class IngestResult:
+    """Результат пакетной загрузки CSV файла"""
+    filepath: str
+    program: str
+    list_date: str
+    loaded: int = 0
+    rejected: List[RejectedRow] = field(default_factory=list)
+    error: Optional[str] = None
+    # Изменения списка в базе: новые, измененные и удаленные строки
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    # Файл не изменился с прошлой загрузки (по манифесту) и не читался
+    skipped: bool = False
+    
+    @property
+    def success(self) -> bool:
+        return self.error is None
+    
+    @property
+    def changed(self) -> bool:
+        """Изменился ли список (если нет - версия списка не увеличивается)"""
+        return bool(self.inserted or self.updated or self.deleted)
+    
+    @property
+    def quality(self) -> Dict[str, int]:
+        """Отчет о качестве файла: число отклоненных строк по правилам проверки"""
+        counts = {}
+        for rejected in self.rejected:
+            counts[rejected.rule] = counts.get(rejected.rule, 0) + 1
+        return counts
+
 # КЛАСС ДЛЯ ГЕНЕРАЦИИ ТЕСТОВЫХ ДАННЫХ (С ЦЕЛЕВЫМИ БАЛЛАМИ)
 class FixedTestDataGenerator:
     def __init__(self):
@@ -145,7 +392,7 @@ class FixedTestDataGenerator:
             elif day == '04.08':
                 physics = random.randint(70, 100)
                 russian = random.randint(70, 100)
-                math = random.randint(70, 110)
+                math = random.randint(70, 100)
             else:
                 physics = random.randint(50, 100)
                 russian = random.randint(50, 100)
@@ -582,19 +829,478 @@ class FixedTestDataGenerator:
         print("2. Рассчитайте проходные баллы")
         print("3. Убедитесь, что результаты соответствуют целевым значениям")
 
+# КЛАСС ДЛЯ УПРАВЛЕНИЯ СОЕДИНЕНИЯМИ С БАЗОЙ ДАННЫХ
+class ConnectionManager:
+    """Долгоживущие соединения SQLite - по одному на поток"""
+    # Размер кэша подготовленных выражений для каждого соединения
+    STATEMENT_CACHE_SIZE = 256
+    
+    def __init__(self, db_path: str, pragmas: Dict[str, Any] = None):
+        self.db_path = db_path
+        self.pragmas = dict(pragmas or {})
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+    
+    def get(self) -> sqlite3.Connection:
+        """Соединение текущего потока (создается при первом обращении)"""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                cached_statements=self.STATEMENT_CACHE_SIZE
+            )
+            for name, value in self.pragmas.items():
+                conn.execute(f"PRAGMA {name} = {value}")
+            self._local.connection = conn
+            with self._lock:
+                self._connections.add(conn)
+        return conn
+    
+    def close_current(self):
+        """Закрытие соединения текущего потока"""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            return
+        self._local.connection = None
+        with self._lock:
+            self._connections.discard(conn)
+        conn.close()
+    
+    def close_all(self):
+        """Закрытие всех открытых соединений (при завершении работы)"""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Ошибка при закрытии соединения: {e}")
+        self._local = threading.local()
+
+# КЛАСС ДЛЯ РАСЧЕТА ПРОХОДНЫХ БАЛЛОВ
+class PassScoreCalculator:
+    """Отбор зачисляемых: сначала по приоритету (1-4), затем по убыванию баллов"""
+    
+    @staticmethod
+    def python(applicants: List[Dict], places: int) -> PassScoreResult:
+        """Исходный алгоритм на списках словарей"""
+        if not applicants or places <= 0:
+            return PassScoreResult(None, len(applicants))
+        
+        applicants = sorted(applicants, key=lambda x: (x['priority'], -x['total_score']))
+        
+        admitted = []
+        current_priority = 1
+        
+        while current_priority <= 4 and len(admitted) < places:
+            priority_applicants = [a for a in applicants if a['priority'] == current_priority]
+            priority_applicants.sort(key=lambda x: -x['total_score'])
+            
+            for applicant in priority_applicants:
+                if len(admitted) < places:
+                    admitted.append(applicant)
+                else:
+                    break
+            current_priority += 1
+        
+        priority_counts = [
+            len([a for a in applicants if a['priority'] == i]) for i in range(1, 5)
+        ]
+        admitted_counts = [
+            len([a for a in admitted if a['priority'] == i]) for i in range(1, 5)
+        ]
+        
+        pass_score = admitted[-1]['total_score'] if len(admitted) == places else None
+        return PassScoreResult(pass_score, len(applicants), priority_counts, admitted_counts)
+    
+    @staticmethod
+    def admitted_counts(priority_counts: np.ndarray, places: int) -> np.ndarray:
+        """Число зачисленных по приоритетам 1-4 при заданном числе мест"""
+        # Места, оставшиеся к началу каждого приоритета
+        seats_before = places - np.concatenate(([0], np.cumsum(priority_counts)[:-1]))
+        return np.minimum(priority_counts, np.maximum(seats_before, 0))
+    
+    @staticmethod
+    def last_admitted(admitted_counts: np.ndarray, places: int):
+        """(приоритет, k) последнего зачисленного или None, если места не заполнены"""
+        if places <= 0 or admitted_counts.sum() < places:
+            return None
+        last_priority = int(np.flatnonzero(admitted_counts)[-1]) + 1
+        return last_priority, int(admitted_counts[last_priority - 1])
+    
+    @staticmethod
+    def numpy(priorities: np.ndarray, totals: np.ndarray, places: int) -> PassScoreResult:
+        """Векторный алгоритм: bincount по приоритетам и partition внутри приоритета"""
+        total_apps = len(priorities)
+        if total_apps == 0 or places <= 0:
+            return PassScoreResult(None, total_apps)
+        
+        priority_counts = np.bincount(priorities, minlength=5)[1:5]
+        admitted_counts = PassScoreCalculator.admitted_counts(priority_counts, places)
+        
+        pass_score = None
+        last = PassScoreCalculator.last_admitted(admitted_counts, places)
+        if last is not None:
+            # Последний зачисленный - k-й по убыванию балл в последнем заполненном приоритете
+            last_priority, k = last
+            scores = totals[priorities == last_priority]
+            position = len(scores) - k
+            pass_score = int(np.partition(scores, position)[position])
+        
+        return PassScoreResult(
+            pass_score, total_apps, priority_counts.tolist(), admitted_counts.tolist()
+        )
+
+# КЛАСС ДЛЯ ЗАЧИСЛЕНИЯ С УЧЕТОМ ПРИОРИТЕТОВ МЕЖДУ ПРОГРАММАМИ
+class CrossProgramAdmission:
+    """Отложенное принятие (Гейл-Шепли): абитуриент зачисляется на программу
+    с наивысшим приоритетом, где он проходит по баллам"""
+    
+    @staticmethod
+    def assign(applications, places: Dict[str, int]) -> Dict[str, List[tuple]]:
+        """Распределение заявлений (external_id, program, priority, total_score).
+        
+        Возвращает для каждой программы кучу зачисленных
+        (total_score, -external_id, external_id, priority): первый элемент -
+        худший зачисленный. При равных баллах выше стоит меньший external_id.
+        """
+        choices = {}
+        for external_id, program, priority, total_score in applications:
+            choices.setdefault(external_id, []).append((priority, program, total_score))
+        for preferences in choices.values():
+            preferences.sort()
+        
+        admitted = {program: [] for program in places}
+        next_choice = dict.fromkeys(choices, 0)
+        free = list(choices)
+        
+        # Каждое заявление рассматривается не более одного раза, операции
+        # с кучей - O(log мест), итого O(N log N) по всем заявлениям даты
+        while free:
+            external_id = free.pop()
+            preferences = choices[external_id]
+            while next_choice[external_id] < len(preferences):
+                priority, program, total_score = preferences[next_choice[external_id]]
+                next_choice[external_id] += 1
+                
+                capacity = places.get(program, 0)
+                if capacity <= 0:
+                    continue
+                
+                heap = admitted[program]
+                entry = (total_score, -external_id, external_id, priority)
+                if len(heap) < capacity:
+                    heapq.heappush(heap, entry)
+                    break
+                if entry > heap[0]:
+                    displaced = heapq.heapreplace(heap, entry)
+                    free.append(displaced[2])
+                    break
+        
+        return admitted
+
+# КЛАСС КОЛОНОЧНОГО СНИМКА АБИТУРИЕНТОВ
+class ApplicantsSnapshot:
+    """Снимок applicants в памяти: numpy-массив на колонку, программа и дата
+    закодированы словарем (категории программ - названия, дат - номера дней).
+    Строки хранятся в порядке total_score DESC, external_id"""
+    
+    # Колонки со словарным кодированием: коды совпадают с порядком строк
+    ENCODED_COLUMNS = ('program', 'list_date')
+    
+    def __init__(self, columns: Dict[str, np.ndarray], categories: Dict[str, np.ndarray],
+                 list_date: Optional[str], generation: int):
+        self.columns = columns
+        self.categories = categories
+        self.list_date = list_date
+        self.generation = generation
+        self._orders = {}
+    
+    def __len__(self):
+        return len(self.columns['id'])
+    
+    @classmethod
+    def load(cls, cursor, list_date: Optional[str], generation: int) -> 'ApplicantsSnapshot':
+        """Чтение снимка за дату (или всей таблицы) одним запросом"""
+        query = f"SELECT {', '.join(EnhancedDatabase.APPLICANT_COLUMNS)} FROM applicants"
+        params = []
+        if list_date is not None:
+            query += " WHERE list_date = ?"
+            params.append(list_date)
+        query += " ORDER BY total_score DESC, external_id"
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.execute("SELECT id, name FROM programs")
+        program_names = dict(cursor.fetchall())
+        
+        values_by_column = list(zip(*rows)) if rows else [()] * len(EnhancedDatabase.APPLICANT_COLUMNS)
+        columns = {}
+        categories = {}
+        for name, values in zip(EnhancedDatabase.APPLICANT_COLUMNS, values_by_column):
+            if name in cls.ENCODED_COLUMNS:
+                codes, uniques = pd.factorize(np.array(values, dtype=object), sort=True)
+                if name == 'program':
+                    # Коды словаря programs -> названия, перенумерованные по алфавиту
+                    uniques = np.array([program_names.get(key, key) for key in uniques], dtype=object)
+                    order = np.argsort(uniques, kind='stable')
+                    codes = np.argsort(order)[codes] if len(codes) else codes
+                    uniques = uniques[order]
+                categories[name] = uniques
+                columns[name] = codes.astype(np.int32)
+            else:
+                columns[name] = np.array(values, dtype=np.int64)
+        return cls(columns, categories, list_date, generation)
+    
+    def condition_mask(self, condition: FilterCondition) -> np.ndarray:
+        """Булева маска одного условия (семантика как у SQL-фильтра)"""
+        if condition.field not in self.columns:
+            raise ValueError(f"Недопустимое поле фильтра: {condition.field}")
+        operand = FilterCompiler.value(condition)
+        
+        if condition.field in self.ENCODED_COLUMNS:
+            # Условие проверяется на словаре, затем раскрывается по кодам
+            categories = self.categories[condition.field]
+            category_mask = np.array(
+                [self._compare(value, condition.operator, operand) for value in categories],
+                dtype=bool
+            )
+            return category_mask[self.columns[condition.field]] if len(categories) else np.zeros(len(self), dtype=bool)
+        return self._compare(self.columns[condition.field], condition.operator, operand)
+    
+    @staticmethod
+    def _compare(values, operator: str, value):
+        if operator == "=":
+            return values == value
+        if operator == ">":
+            return values > value
+        if operator == "<":
+            return values < value
+        if operator == ">=":
+            return values >= value
+        if operator == "<=":
+            return values <= value
+        if operator == "!=":
+            return values != value
+        if operator == "IN":
+            value = value if isinstance(value, (list, tuple, set)) else [value]
+            if isinstance(values, np.ndarray):
+                return np.isin(values, list(value))
+            return values in value
+        if operator == "BETWEEN":
+            low, high = value
+            return (values >= low) & (values <= high)
+        raise ValueError(f"Неподдерживаемый оператор фильтра: {operator}")
+    
+    def filter_mask(self, filters=None) -> np.ndarray:
+        """Маска фильтров (список условий или FilterGroup)"""
+        return FilterCompiler.to_mask(filters, self)
+    
+    def order(self, order_by: str, descending: bool) -> Optional[np.ndarray]:
+        """Перестановка строк для сортировки (None - порядок хранения)"""
+        if order_by not in self.columns:
+            raise ValueError(f"Недопустимая колонка сортировки: {order_by}")
+        if order_by == 'total_score' and descending:
+            return None
+        key = (order_by, descending)
+        if key not in self._orders:
+            values = self.columns[order_by]
+            # Равные значения упорядочены по external_id, как в SQL-запросе
+            self._orders[key] = np.lexsort((self.columns['external_id'], -values if descending else values))
+        return self._orders[key]
+    
+    def filter_ids(self, filters: List[FilterCondition] = None, order_by: str = "total_score",
+                   descending: bool = True) -> np.ndarray:
+        """Упорядоченные ID строк, прошедших фильтры"""
+        mask = self.filter_mask(filters)
+        order = self.order(order_by, descending)
+        if order is None:
+            return self.columns['id'][mask]
+        return self.columns['id'][order[mask[order]]]
+
+# КЛАСС МАТРИЦЫ КОЛИЧЕСТВ ЗАЯВЛЕНИЙ
+class CountMatrix:
+    """Количество заявлений по осям дата × программа × согласие × приоритет"""
+    
+    def __init__(self, dates: List[int], programs: List[str], counts: np.ndarray, generation: int):
+        # dates - номера дней по возрастанию; наружу отдаются в виде ДД.ММ
+        self.dates = [ListDate.to_label(date) for date in dates]
+        self.programs = programs
+        self.counts = counts
+        self.generation = generation
+        self._date_index = {date: i for i, date in enumerate(dates)}
+        self._program_index = {program: i for i, program in enumerate(programs)}
+    
+    @classmethod
+    def load(cls, cursor, generation: int) -> 'CountMatrix':
+        """Вся матрица из сводной таблицы (строка на группу)"""
+        cursor.execute(
+            "SELECT s.list_date, p.name, s.consent, s.priority, s.applications "
+            "FROM applicants_summary s JOIN programs p ON p.id = s.program"
+        )
+        rows = cursor.fetchall()
+        
+        dates = sorted({row[0] for row in rows})
+        programs = sorted({row[1] for row in rows})
+        date_index = {date: i for i, date in enumerate(dates)}
+        program_index = {program: i for i, program in enumerate(programs)}
+        
+        counts = np.zeros((len(dates), len(programs), 2, 4), dtype=np.int64)
+        for date, program, consent, priority, count in rows:
+            counts[date_index[date], program_index[program], 1 if consent else 0, priority - 1] = count
+        return cls(dates, programs, counts, generation)
+    
+    def count(self, program: str = None, date: str = None, consent: bool = None,
+              priority: int = None) -> int:
+        """Количество заявлений; None по оси означает сумму по всем значениям"""
+        if date is not None:
+            date = ListDate.to_key(date)
+        selection = []
+        for value, index in ((date, self._date_index), (program, self._program_index)):
+            if value is None:
+                selection.append(slice(None))
+            elif value in index:
+                selection.append(index[value])
+            else:
+                return 0
+        
+        selection.append(slice(None) if consent is None else (1 if consent else 0))
+        if priority is None:
+            selection.append(slice(None))
+        elif 1 <= priority <= 4:
+            selection.append(priority - 1)
+        else:
+            return 0
+        return int(self.counts[tuple(selection)].sum())
+
 # КЛАСС БАЗЫ ДАННЫХ
 class EnhancedDatabase:
-    def __init__(self, db_path="admission.db"):
+    # Колонки CSV файла конкурсного списка
+    CSV_INT_COLUMNS = [
+        'id', 'priority', 'physics_score', 'russian_score',
+        'math_score', 'achievements_score', 'total_score'
+    ]
+    CSV_COLUMNS = ['id', 'consent'] + CSV_INT_COLUMNS[1:]
+    CONSENT_VALUES = {
+        'true': True, '1': True, 'да': True, 'yes': True,
+        'false': False, '0': False, 'нет': False, 'no': False
+    }
+    # Допустимые диапазоны баллов; total_score должен равняться сумме остальных
+    CSV_SCORE_RANGES = {
+        'physics_score': (0, 100), 'russian_score': (0, 100), 'math_score': (0, 100),
+        'achievements_score': (0, 10), 'total_score': (0, 310)
+    }
+    # Наибольший разброс id, при котором повторы ищутся битовой картой, а не хэшированием
+    DUPLICATE_BITMAP_SPAN = 1 << 26
+    # Узкие типы колонок при потоковом чтении CSV (consent определяется pandas).
+    # Баллы читаются как int16, чтобы значения вне диапазона дошли до проверки
+    CSV_STREAM_DTYPES = {
+        'id': np.uint32, 'priority': np.int8, 'physics_score': np.int16,
+        'russian_score': np.int16, 'math_score': np.int16,
+        'achievements_score': np.int16, 'total_score': np.int16
+    }
+    # Число строк CSV, читаемых за один шаг потоковой загрузки
+    STREAM_CHUNK_ROWS = 100000
+    # Размер блока чтения при вычислении хэша файла для манифеста загрузок
+    MANIFEST_HASH_BLOCK = 1 << 20
+    # Суммарный размер файлов даты, начиная с которого они разбираются в пуле
+    # процессов: запуск процесса spawn с импортом Qt и matplotlib стоит ~1-1.5 с,
+    # а разбор идет со скоростью ~40 МБ/с, поэтому пул окупается только на
+    # сотнях мегабайт. Меньшие даты разбирает один поток рядом с писателем
+    PARALLEL_PARSE_MIN_BYTES = 128 * 1024 * 1024
+    # После загрузки такого числа строк обновляется статистика планировщика
+    ANALYZE_ROW_THRESHOLD = 10000
+    # Колонки таблицы абитуриентов в порядке отображения
+    APPLICANT_COLUMNS = (
+        'id', 'program', 'list_date', 'consent', 'priority', 'physics_score',
+        'russian_score', 'math_score', 'achievements_score', 'total_score', 'external_id'
+    )
+    # Ширина корзины гистограммы баллов в сводной таблице
+    SCORE_BUCKET_WIDTH = 10
+    # Количество бюджетных мест по программам
+    PROGRAM_PLACES = {'ПМ': 40, 'ИВТ': 50, 'ИТСС': 30, 'ИБ': 20}
+    # Движки расчета проходного балла (см. PassScoreCalculator)
+    PASS_SCORE_ENGINES = ('numpy', 'python')
+    # Режимы зачисления: каждая программа отдельно или с учетом приоритетов
+    # абитуриента между программами (см. CrossProgramAdmission)
+    ADMISSION_MODES = ('independent', 'cross_program')
+    # Режимы загрузки списка: replace - удаление и вставка всех строк;
+    # diff - запись только отличий от сохраненного списка по external_id
+    INGEST_MODES = ('replace', 'diff')
+    # Число параметров в одном IN (...) (меньше лимита переменных SQLite)
+    SQL_IN_CHUNK = 10000
+    # Профили хранения: PRAGMA для каждого нового соединения
+    STORAGE_PROFILES = {
+        'default': {},
+        # WAL: чтение из интерфейса не блокируется записью рабочих потоков
+        'concurrent': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 10000,
+            'cache_size': -65536,
+            'mmap_size': 268435456,
+            'temp_store': 'MEMORY',
+            'wal_autocheckpoint': 1000
+        }
+    }
+    
+    def __init__(self, db_path="admission.db", storage_profile="default"):
+        if storage_profile not in self.STORAGE_PROFILES:
+            raise ValueError(f"Неизвестный профиль хранения: {storage_profile}")
         self.db_path = db_path
+        self.storage_profile = storage_profile
+        self.connections = ConnectionManager(db_path, self.STORAGE_PROFILES[storage_profile])
+        # Счетчик изменений applicants в этом процессе и кэш колоночного снимка
+        self.data_generation = 0
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
+        self._count_matrix = None
+        self._count_matrix_lock = threading.Lock()
+        # Кэш словаря programs: название -> код и код -> название
+        self._program_ids = {}
+        self._program_names = {}
+        self._programs_lock = threading.Lock()
         self.init_database()
     
+    @property
+    def uses_wal(self) -> bool:
+        """Включен ли режим WAL в текущем профиле хранения"""
+        return self.STORAGE_PROFILES[self.storage_profile].get('journal_mode') == 'WAL'
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """Соединение с базой для текущего потока"""
+        return self.connections.get()
+    
+    def close_thread_connection(self):
+        """Закрытие соединения текущего потока (вызывается рабочими потоками)"""
+        self.connections.close_current()
+    
+    def checkpoint(self, mode: str = "PASSIVE"):
+        """Перенос журнала WAL в основной файл базы"""
+        if not self.uses_wal:
+            return None
+        return self.get_connection().execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    
+    def close(self):
+        """Закрытие всех соединений при завершении работы"""
+        try:
+            self.checkpoint("TRUNCATE")
+        except sqlite3.Error as e:
+            print(f"Ошибка контрольной точки WAL: {e}")
+        self.connections.close_all()
+    
     def init_database(self):
         """Инициализация базы данных"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('PRAGMA encoding = "UTF-8"')
         
+        # Исходная схема; program и list_date переводятся в целые коды
+        # миграцией _migration_integer_keys
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS applicants (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -643,197 +1349,1516 @@ class EnhancedDatabase:
             )
         ''')
         
+        self.migrate_schema(cursor)
+        
         conn.commit()
-        conn.close()
+    
+    def migrate_schema(self, cursor):
+        """Пошаговая миграция схемы (номер версии хранится в PRAGMA user_version)"""
+        migrations = [
+            self._migration_applicants_indexes,
+            self._migration_list_versions,
+            self._migration_applicants_summary,
+            self._migration_iso_dates,
+            self._migration_integer_keys,
+            self._migration_ingest_manifest,
+            self._migration_quarantine,
+        ]
+        
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(migrations[version:], start=version + 1):
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {number}")
+    
+    def _migration_applicants_indexes(self, cursor):
+        """Составные индексы под основные запросы к applicants"""
+        # Расчет проходного балла и подсчеты по программе/дате:
+        # WHERE list_date = ? AND program = ? AND consent = ? ORDER BY priority, total_score
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_applicants_rank
+            ON applicants (list_date, program, consent, priority, total_score)
+        ''')
+        # Таблица абитуриентов за дату: ORDER BY total_score DESC, external_id
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_applicants_date_score
+            ON applicants (list_date, total_score DESC, external_id)
+        ''')
+        # Все абитуриенты и фильтры по баллу без даты
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_applicants_score
+            ON applicants (total_score DESC, external_id)
+        ''')
+        self.analyze(cursor)
+    
+    def _migration_list_versions(self, cursor):
+        """Счетчики изменений списков и отпечаток данных у проходного балла"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS list_versions (
+                program TEXT NOT NULL,
+                list_date TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 1,
+                PRIMARY KEY (program, list_date)
+            )
+        ''')
+        cursor.execute('''
+            INSERT OR IGNORE INTO list_versions (program, list_date)
+            SELECT DISTINCT program, list_date FROM applicants
+        ''')
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(pass_scores)")]
+        if 'source_fingerprint' not in columns:
+            cursor.execute("ALTER TABLE pass_scores ADD COLUMN source_fingerprint TEXT")
+    
+    def _migration_applicants_summary(self, cursor):
+        """Сводная таблица по (дата, программа, согласие, приоритет) и гистограмма баллов"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS applicants_summary (
+                list_date TEXT NOT NULL,
+                program TEXT NOT NULL,
+                consent BOOLEAN NOT NULL,
+                priority INTEGER NOT NULL,
+                applications INTEGER NOT NULL,
+                score_sum INTEGER NOT NULL,
+                score_min INTEGER NOT NULL,
+                score_max INTEGER NOT NULL,
+                PRIMARY KEY (list_date, program, consent, priority)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS applicants_score_histogram (
+                list_date TEXT NOT NULL,
+                program TEXT NOT NULL,
+                consent BOOLEAN NOT NULL,
+                priority INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                applications INTEGER NOT NULL,
+                PRIMARY KEY (list_date, program, consent, priority, bucket)
+            ) WITHOUT ROWID
+        ''')
+        self._fill_summary(cursor, "1=1", ())
+    
+    def _migration_iso_dates(self, cursor):
+        """Перевод дат списков из ДД.ММ в ISO ГГГГ-ММ-ДД во всех таблицах"""
+        iso = f"'{ListDate.CAMPAIGN_YEAR}-' || substr(list_date, 4, 2) || '-' || substr(list_date, 1, 2)"
+        # Индексы по list_date дешевле построить заново, чем обновлять построчно
+        cursor.execute("DROP INDEX IF EXISTS idx_applicants_rank")
+        cursor.execute("DROP INDEX IF EXISTS idx_applicants_date_score")
+        for table in ('applicants', 'pass_scores', 'statistics', 'list_versions',
+                      'applicants_summary', 'applicants_score_histogram'):
+            cursor.execute(
+                f"UPDATE {table} SET list_date = {iso} "
+                f"WHERE list_date GLOB '[0-9][0-9].[0-9][0-9]'"
+            )
+        self._migration_applicants_indexes(cursor)
+    
+    def _migration_integer_keys(self, cursor):
+        """Словарь программ и целые коды program и list_date во всех таблицах"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS programs (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.executemany(
+            "INSERT OR IGNORE INTO programs (name) VALUES (?)",
+            [(program,) for program in self.PROGRAM_PLACES]
+        )
+        
+        tables = ['pass_scores', 'statistics', 'list_versions',
+                  'applicants_summary', 'applicants_score_histogram', 'applicants']
+        for table in tables:
+            cursor.execute(
+                f"INSERT OR IGNORE INTO programs (name) SELECT DISTINCT program FROM {table}"
+            )
+        for table in tables:
+            self._rebuild_with_integer_keys(cursor, table)
+        
+        self._migration_applicants_indexes(cursor)
+    
+    def _migration_ingest_manifest(self, cursor):
+        """Манифест загрузок: из какой версии файла загружен каждый список"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingest_manifest (
+                program INTEGER NOT NULL,
+                list_date INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                content_hash TEXT NOT NULL,
+                row_count INTEGER NOT NULL,
+                rejected_count INTEGER NOT NULL,
+                loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (program, list_date)
+            )
+        ''')
+    
+    def _migration_quarantine(self, cursor):
+        """Карантин: строки файлов, отклоненные проверкой качества при загрузке"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS quarantine (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                program INTEGER NOT NULL,
+                list_date INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                row INTEGER NOT NULL,
+                external_id TEXT,
+                rule TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                raw TEXT,
+                quarantined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_quarantine_list ON quarantine (program, list_date)")
+    
+    def _rebuild_with_integer_keys(self, cursor, table: str):
+        """Пересоздание таблицы с INTEGER вместо TEXT у program и list_date.
+        
+        Тип колонки в SQLite меняется только пересозданием таблицы; индексы
+        удаляются вместе со старой таблицей.
+        """
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        ddl = cursor.fetchone()[0]
+        ddl = ddl.replace(table, f"{table}_new", 1)
+        ddl = ddl.replace("program TEXT", "program INTEGER").replace("list_date TEXT", "list_date INTEGER")
+        cursor.execute(ddl)
+        
+        columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()]
+        expressions = {
+            'program': f"(SELECT id FROM programs WHERE name = {table}.program)",
+            'list_date': (f"CAST(round(julianday(list_date) - "
+                          f"julianday('{ListDate.CAMPAIGN_YEAR}-01-01')) AS INTEGER)"),
+        }
+        select = ", ".join(expressions.get(column, column) for column in columns)
+        cursor.execute(
+            f"INSERT INTO {table}_new ({', '.join(columns)}) SELECT {select} FROM {table}"
+        )
+        
+        # Счетчик AUTOINCREMENT сохраняется, чтобы ID удаленных строк не повторялись
+        sequence = None
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'").fetchone():
+            sequence = cursor.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)
+            ).fetchone()
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+        if sequence is not None:
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+            cursor.execute(
+                f"INSERT INTO sqlite_sequence (name, seq) "
+                f"SELECT ?, MAX(?, COALESCE(MAX(id), 0)) FROM {table}",
+                (table, sequence[0])
+            )
+    
+    def _load_programs(self):
+        """Перечитывание словаря programs в кэш"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT id, name FROM programs")
+        rows = cursor.fetchall()
+        with self._programs_lock:
+            self._program_ids = {name: key for key, name in rows}
+            self._program_names = {key: name for key, name in rows}
+    
+    def _program_key(self, program: str, create: bool = False) -> int:
+        """Код программы в словаре programs.
+        
+        Для неизвестной программы возвращается 0 (не совпадает ни с одной
+        строкой) или, при create=True, код новой записи словаря.
+        """
+        key = self._program_ids.get(program)
+        if key is None:
+            self._load_programs()
+            key = self._program_ids.get(program)
+        if key is None and create:
+            # Словарь пополняется своей транзакцией до записи данных списка:
+            # откат загрузки не оставляет в кэше несуществующих кодов
+            conn = self.get_connection()
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO programs (name) VALUES (?)", (program,))
+            self._load_programs()
+            key = self._program_ids.get(program)
+        return key if key is not None else 0
+    
+    def _program_name(self, key: int) -> str:
+        """Название программы по коду словаря programs"""
+        name = self._program_names.get(key)
+        if name is None:
+            self._load_programs()
+            name = self._program_names.get(key, key)
+        return name
+    
+    def _insert_applicants(self, cursor, records, upsert: bool = False):
+        """Вставка строк (external_id, program, list_date, consent, priority,
+        physics, russian, math, achievements, total) с заменой существующих.
+        
+        При upsert=True существующая строка обновляется на месте
+        (ON CONFLICT DO UPDATE): ID и время создания заявления сохраняются.
+        """
+        conflict = '''
+            ON CONFLICT(external_id, program, list_date) DO UPDATE SET
+                consent = excluded.consent, priority = excluded.priority,
+                physics_score = excluded.physics_score,
+                russian_score = excluded.russian_score,
+                math_score = excluded.math_score,
+                achievements_score = excluded.achievements_score,
+                total_score = excluded.total_score
+        ''' if upsert else ""
+        cursor.executemany(f'''
+            INSERT {"" if upsert else "OR REPLACE "}INTO applicants
+            (external_id, program, list_date, consent, priority,
+             physics_score, russian_score, math_score,
+             achievements_score, total_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            {conflict}
+        ''', records)
+    
+    def _apply_list_diff(self, cursor, program: int, list_date: int, records) -> tuple:
+        """Запись только отличий строк файла от сохраненного списка (программа, дата).
+        
+        Возвращает (новых, измененных, удаленных) строк.
+        """
+        cursor.execute('''
+            SELECT external_id, consent, priority, physics_score, russian_score,
+                   math_score, achievements_score, total_score
+            FROM applicants WHERE list_date = ? AND program = ?
+        ''', (list_date, program))
+        stored = {row[0]: row[1:] for row in cursor.fetchall()}
+        # При повторе external_id в файле побеждает последняя строка, как при замене
+        incoming = {record[0]: record for record in records}
+        
+        changed = [
+            record for external_id, record in incoming.items()
+            if stored.get(external_id) != tuple(record[3:])
+        ]
+        missing = [external_id for external_id in stored if external_id not in incoming]
+        inserted = sum(1 for record in changed if record[0] not in stored)
+        if not changed and not missing:
+            return 0, 0, 0
+        
+        self._lists_changed(cursor, [(program, list_date)])
+        for start in range(0, len(missing), self.SQL_IN_CHUNK):
+            chunk = missing[start:start + self.SQL_IN_CHUNK]
+            self._delete_rows(
+                cursor,
+                f"list_date = ? AND program = ? AND external_id IN ({', '.join('?' * len(chunk))})",
+                [list_date, program] + chunk
+            )
+        if changed:
+            self._insert_applicants(cursor, changed, upsert=True)
+        self._refresh_summary(cursor, [(program, list_date)])
+        return inserted, len(changed) - inserted, len(missing)
+    
+    def _delete_rows(self, cursor, where: str, params=()) -> int:
+        """Физическое удаление строк applicants по условию"""
+        cursor.execute(f"DELETE FROM applicants WHERE {where}", params)
+        return cursor.rowcount
+    
+    def _fill_summary(self, cursor, where: str, params):
+        """Пересчет сводки и гистограммы для строк applicants по условию"""
+        # Группировка идет в порядке idx_applicants_rank (покрывающий индекс)
+        cursor.execute(f'''
+            INSERT INTO applicants_summary
+            SELECT list_date, program, consent, priority, COUNT(*),
+                   SUM(total_score), MIN(total_score), MAX(total_score)
+            FROM applicants WHERE {where}
+            GROUP BY list_date, program, consent, priority
+        ''', params)
+        cursor.execute(f'''
+            INSERT INTO applicants_score_histogram
+            SELECT list_date, program, consent, priority,
+                   total_score / {self.SCORE_BUCKET_WIDTH}, COUNT(*)
+            FROM applicants WHERE {where}
+            GROUP BY list_date, program, consent, priority, total_score / {self.SCORE_BUCKET_WIDTH}
+        ''', params)
+    
+    def _refresh_summary(self, cursor, pairs):
+        """Пересчет сводки для измененных списков (программа, дата) после записи"""
+        for program, list_date in set(pairs):
+            for table in ('applicants_summary', 'applicants_score_histogram'):
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE list_date = ? AND program = ?",
+                    (list_date, program)
+                )
+            self._fill_summary(cursor, "list_date = ? AND program = ?", (list_date, program))
+    
+    def _summary_state(self, cursor) -> Dict[tuple, tuple]:
+        """Содержимое сводки и гистограммы (ключ группы -> значения) для проверки"""
+        cursor.execute("SELECT * FROM applicants_summary")
+        state = {('summary',) + tuple(row[:4]): tuple(row[4:]) for row in cursor.fetchall()}
+        cursor.execute("SELECT * FROM applicants_score_histogram")
+        state.update((('histogram',) + tuple(row[:5]), (row[5],)) for row in cursor.fetchall())
+        return state
+    
+    def rebuild_summary(self) -> int:
+        """Проверка сводной таблицы: пересборка с нуля по applicants.
+        
+        Возвращает количество расходившихся строк сводки и гистограммы.
+        """
+        conn = self.get_connection()
+        with conn:
+            cursor = conn.cursor()
+            stored = self._summary_state(cursor)
+            cursor.execute("DELETE FROM applicants_summary")
+            cursor.execute("DELETE FROM applicants_score_histogram")
+            self._fill_summary(cursor, "1=1", ())
+            rebuilt = self._summary_state(cursor)
+        self.data_generation += 1
+        return sum(1 for key in stored.keys() | rebuilt.keys() if stored.get(key) != rebuilt.get(key))
+    
+    def analyze(self, cursor=None):
+        """Обновление статистики планировщика запросов (ANALYZE)"""
+        if cursor is None:
+            cursor = self.get_connection().cursor()
+        # Ограничение выборки делает ANALYZE быстрым даже на миллионах строк
+        cursor.execute("PRAGMA analysis_limit = 1000")
+        cursor.execute("ANALYZE")
     
     def clear_database(self):
         """Очистка базы данных"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM applicants")
         cursor.execute("DELETE FROM pass_scores")
         cursor.execute("DELETE FROM statistics")
+        cursor.execute("DELETE FROM list_versions")
+        cursor.execute("DELETE FROM ingest_manifest")
+        cursor.execute("DELETE FROM quarantine")
+        cursor.execute("DELETE FROM applicants_summary")
+        cursor.execute("DELETE FROM applicants_score_histogram")
         conn.commit()
-        conn.close()
+        self.data_generation += 1
+    
+    def _lists_changed(self, cursor, pairs):
+        """Отметка измененных списков: увеличение счетчика версии (программа, дата).
+        
+        data_generation увеличивает вызывающий код после COMMIT: иначе поток,
+        читающий в этот момент, закэширует старые данные под новым поколением.
+        """
+        pairs = list(pairs)
+        cursor.executemany('''
+            INSERT INTO list_versions (program, list_date, version) VALUES (?, ?, 1)
+            ON CONFLICT(program, list_date) DO UPDATE SET version = version + 1
+        ''', pairs)
+        # Список больше не совпадает с файлом, из которого был загружен;
+        # загрузчик записывает новую версию файла и ее карантин после изменения
+        cursor.executemany(
+            "DELETE FROM ingest_manifest WHERE program = ? AND list_date = ?", pairs
+        )
+        cursor.executemany(
+            "DELETE FROM quarantine WHERE program = ? AND list_date = ?", pairs
+        )
+    
+    def _affected_lists(self, cursor, where: str, params) -> List[tuple]:
+        """Списки (программа, дата), затрагиваемые условием на applicants"""
+        cursor.execute(
+            f"SELECT DISTINCT program, list_date FROM applicants WHERE {where}", params
+        )
+        return cursor.fetchall()
+    
+    def _delete_applicants(self, cursor, where: str, params=(), affected=None) -> int:
+        """Удаление строк applicants по условию с отметкой и пересчетом сводки списков.
+        
+        affected - заранее найденные списки условия (см. _affected_lists).
+        """
+        if affected is None:
+            affected = self._affected_lists(cursor, where, params)
+        self._lists_changed(cursor, affected)
+        deleted_count = self._delete_rows(cursor, where, params)
+        self._refresh_summary(cursor, affected)
+        return deleted_count
+    
+    def list_fingerprints(self, mode: str = "independent", programs: List[str] = None) -> Dict[tuple, str]:
+        """Отпечатки входных данных расчета: (номер дня, код программы) -> строка"""
+        programs = list(programs) if programs is not None else list(self.PROGRAM_PLACES)
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT list_date, program, version FROM list_versions")
+        versions = {(date, program): version for date, program, version in cursor.fetchall()}
+        
+        if mode == "cross_program":
+            # Результат зависит от всех программ даты; счетчики только растут,
+            # поэтому их сумма меняется при любом изменении списков даты
+            date_versions = {}
+            for (date, _), version in versions.items():
+                date_versions[date] = date_versions.get(date, 0) + version
+            return {
+                (date, self._program_key(program)): f"{mode}:{version}"
+                for date, version in date_versions.items() for program in programs
+            }
+        return {key: f"{mode}:{version}" for key, version in versions.items()}
+    
+    def stored_fingerprints(self) -> Dict[tuple, Optional[str]]:
+        """Отпечатки, с которыми были рассчитаны сохраненные проходные баллы"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("SELECT list_date, program, source_fingerprint FROM pass_scores")
+        return {(date, program): fingerprint for date, program, fingerprint in cursor.fetchall()}
+    
+    @staticmethod
+    def program_from_filename(filepath: str) -> str:
+        """Определение программы по имени файла вида ДД.ММ_Программа.csv"""
+        filename = os.path.basename(filepath)
+        parts = filename.split('_')
+        if len(parts) >= 2:
+            return parts[1].split('.')[0]
+        return 'Unknown'
     
     def load_csv(self, filepath: str, list_date: str) -> bool:
-        """Загрузка данных из CSV файла"""
+        """Загрузка данных из CSV файла.
+        
+        Строки проверяются validate_applicants_frame, отклоненные попадают
+        в карантин (см. load_csv_bulk).
+        """
+        result = self.load_csv_bulk(filepath, list_date, force=True)
+        for rejected in result.rejected:
+            print(f"Строка {rejected.row} отклонена: {rejected.reason}")
+        return result.success
+    
+    @classmethod
+    def validate_applicants_frame(cls, df: pd.DataFrame, first_row: int = 2):
+        """Векторная проверка и преобразование колонок конкурсного списка.
+        
+        Правила проверяются по всему DataFrame сразу: наличие колонок, типы,
+        согласие, диапазоны баллов (CSV_SCORE_RANGES), приоритет 1-4, равенство
+        total_score сумме баллов по предметам и достижений, повтор id в файле
+        (действует последняя строка, как при замене). Для строки фиксируется
+        первое нарушенное правило.
+        
+        Возвращает словарь numpy-массивов по колонкам, маску корректных строк
+        и список отклоненных строк (RejectedRow). first_row - номер строки файла,
+        с которой начинается df (2 - первая строка после заголовка).
+        """
+        missing = [name for name in cls.CSV_COLUMNS if name not in df.columns]
+        if missing:
+            raise ValueError(f"В файле отсутствуют колонки: {', '.join(missing)}")
+        
+        row_count = len(df)
+        # Код нарушения строки: номер в rules (0 - строка корректна)
+        codes = np.zeros(row_count, dtype=np.uint8)
+        rules = []
+        
+        def reject(mask, rule, reason):
+            if mask.any():
+                rules.append((rule, reason))
+                codes[mask & (codes == 0)] = len(rules)
+        
+        columns = {}
+        for name in cls.CSV_INT_COLUMNS:
+            series = df[name]
+            if series.dtype.kind in 'iu':
+                # Колонка уже целая (обычный случай) - без преобразования
+                columns[name] = series.to_numpy()
+                continue
+            values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+            bad = ~np.isfinite(values)
+            bad[~bad] = values[~bad] != np.floor(values[~bad])
+            reject(bad, "type", f"некорректное значение {name}")
+            columns[name] = np.where(bad, 0, values).astype(np.int64)
+        
+        consent = df['consent']
+        if consent.dtype == bool:
+            columns['consent'] = consent.to_numpy()
+        else:
+            numeric = pd.to_numeric(consent, errors='coerce').to_numpy(dtype=np.float64)
+            mapped = consent.astype(str).str.strip().str.lower().map(cls.CONSENT_VALUES)
+            known = mapped.notna().to_numpy()
+            bad = np.isnan(numeric) & ~known
+            reject(bad, "consent", "некорректное значение consent")
+            columns['consent'] = np.where(
+                np.isnan(numeric), mapped.fillna(False).to_numpy(dtype=bool), numeric != 0
+            )
+        
+        for name, (low, high) in cls.CSV_SCORE_RANGES.items():
+            values = columns[name]
+            reject((values < low) | (values > high), "range", f"{name} вне диапазона {low}-{high}")
+        
+        priority = columns['priority']
+        reject((priority < 1) | (priority > 4), "priority", "приоритет вне диапазона 1-4")
+        
+        score_sum = np.add(columns['physics_score'], columns['russian_score'], dtype=np.int64)
+        score_sum += columns['math_score']
+        score_sum += columns['achievements_score']
+        reject(score_sum != columns['total_score'], "sum",
+               "total_score не равен сумме баллов по предметам и достижений")
+        
+        checked = np.flatnonzero(codes == 0)
+        repeated = cls._repeated_ids(columns['id'][checked])
+        if repeated is not None:
+            mask = np.zeros(row_count, dtype=bool)
+            mask[checked[repeated]] = True
+            reject(mask, "duplicate", "повтор id в файле (действует последняя строка)")
+        
+        valid = codes == 0
+        bad_rows = np.flatnonzero(~valid)
+        raw = []
+        if len(bad_rows):
+            raw = [
+                ','.join(cls._raw_cell(value) for value in row)
+                for row in df.iloc[bad_rows][cls.CSV_COLUMNS].itertuples(index=False)
+            ]
+        rejected = [
+            RejectedRow(
+                row=first_row + int(idx), external_id=df['id'].iat[idx],
+                reason=rules[codes[idx] - 1][1], rule=rules[codes[idx] - 1][0], raw=raw[position]
+            )
+            for position, idx in enumerate(bad_rows)
+        ]
+        return columns, valid, rejected
+    
+    @staticmethod
+    def _raw_cell(value) -> str:
+        """Значение ячейки в виде, близком к тексту файла"""
+        # Пустая ячейка читается как NaN, а целая колонка с пропусками - как float
+        if pd.isna(value):
+            return ''
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+    
+    @classmethod
+    def _repeated_ids(cls, ids: np.ndarray) -> Optional[np.ndarray]:
+        """Маска повторных вхождений id (кроме последнего) или None, если повторов нет"""
+        if len(ids) == 0:
+            return None
+        low = int(ids.min())
+        span = int(ids.max()) - low + 1
+        if span <= cls.DUPLICATE_BITMAP_SPAN:
+            # Обычно повторов нет: битовая карта доказывает это быстрее хэширования
+            marks = np.zeros(span, dtype=bool)
+            marks[ids.astype(np.int64) - low] = True
+            if np.count_nonzero(marks) == len(ids):
+                return None
+        repeated = pd.Series(ids).duplicated(keep='last').to_numpy()
+        return repeated if repeated.any() else None
+    
+    def load_csv_bulk(self, filepath: str, list_date: str, mode: str = "replace",
+                      force: bool = False) -> IngestResult:
+        """Пакетная загрузка CSV файла одной транзакцией.
+        
+        В режиме diff файл сравнивается с сохраненным списком по external_id:
+        вставляются новые строки, обновляются измененные, удаляются пропавшие.
+        Если список не изменился, его версия и сводка не трогаются.
+        Файл с тем же хэшем, что в манифесте загрузок, пропускается (skipped),
+        если не задано force=True.
+        """
+        if mode not in self.INGEST_MODES:
+            raise ValueError(f"Неизвестный режим загрузки: {mode}")
+        program = self.program_from_filename(filepath)
+        result = IngestResult(filepath=filepath, program=program, list_date=list_date)
+        
         try:
+            list_date = ListDate.to_key(list_date)
+            program_key = self._program_key(program, create=True)
+            known_hash = None if force else self._manifest_hash(program_key, list_date)
+            digest, columns, result.rejected, error = self.parse_list_file(filepath, known_hash)
+            if error is not None:
+                raise ValueError(error)
+            if columns is None:
+                result.skipped = True
+                return result
+            
+            conn = self.get_connection()
+            with conn:
+                self._write_list(conn.cursor(), result, program_key, list_date, columns, mode, digest)
+            if result.changed:
+                self.data_generation += 1
+            
+            if result.inserted + result.deleted >= self.ANALYZE_ROW_THRESHOLD:
+                self.analyze()
+        
+        except Exception as e:
+            result.loaded = result.inserted = result.updated = result.deleted = 0
+            result.error = str(e)
+            print(f"Ошибка загрузки CSV: {e}")
+        
+        return result
+    
+    @classmethod
+    def parse_list_file(cls, filepath: str, known_hash: str = None):
+        """Чтение и проверка CSV файла без обращения к базе.
+        
+        Выполняется и в процессах пула загрузки, поэтому ошибки не пробрасываются.
+        Возвращает (хэш файла, колонки корректных строк, отклоненные строки,
+        текст ошибки или None). Если хэш равен known_hash, файл не разбирается
+        и колонки равны None.
+        """
+        try:
+            digest = cls.file_digest(filepath)
+            if digest == known_hash:
+                return digest, None, [], None
             df = pd.read_csv(filepath, encoding='utf-8')
-            
-            filename = os.path.basename(filepath)
-            parts = filename.split('_')
-            if len(parts) >= 2:
-                program = parts[1].split('.')[0]
-            else:
-                program = 'Unknown'
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "DELETE FROM applicants WHERE program = ? AND list_date = ?",
-                (program, list_date)
+            columns, valid, rejected = cls.validate_applicants_frame(df)
+            return digest, {name: values[valid] for name, values in columns.items()}, rejected, None
+        except Exception as e:
+            return None, None, [], str(e)
+    
+    @classmethod
+    def file_digest(cls, filepath: str) -> str:
+        """Хэш содержимого файла (BLAKE2b), файл читается блоками"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(filepath, 'rb') as file:
+            for block in iter(lambda: file.read(cls.MANIFEST_HASH_BLOCK), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _manifest_hash(self, program: int, list_date: int) -> Optional[str]:
+        """Хэш файла, из которого загружен список (программа, дата), или None"""
+        row = self.get_connection().execute(
+            "SELECT content_hash FROM ingest_manifest WHERE program = ? AND list_date = ?",
+            (program, list_date)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def _record_manifest(self, cursor, result: IngestResult, program: int, list_date: int, digest: str):
+        """Запись версии файла, из которого загружен список, в манифест"""
+        stat = os.stat(result.filepath)
+        cursor.execute('''
+            INSERT OR REPLACE INTO ingest_manifest
+            (program, list_date, path, size, mtime, content_hash, row_count, rejected_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (program, list_date, os.path.abspath(result.filepath), stat.st_size, stat.st_mtime,
+              digest, result.loaded, len(result.rejected)))
+    
+    def _quarantine_rows(self, cursor, result: IngestResult, program: int, list_date: int):
+        """Отклоненные строки файла в карантин (заменяют прежние для списка)"""
+        cursor.execute(
+            "DELETE FROM quarantine WHERE program = ? AND list_date = ?", (program, list_date)
+        )
+        path = os.path.abspath(result.filepath)
+        cursor.executemany('''
+            INSERT INTO quarantine (program, list_date, path, row, external_id, rule, reason, raw)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (program, list_date, path, rejected.row, str(rejected.external_id),
+             rejected.rule, rejected.reason, rejected.raw)
+            for rejected in result.rejected
+        ])
+    
+    def get_quarantine(self, program: str = None, list_date: str = None) -> List[Dict]:
+        """Строки в карантине (все или по программе и/или дате)"""
+        conditions = []
+        params = []
+        if program:
+            conditions.append("program = ?")
+            params.append(self._program_key(program))
+        if list_date:
+            conditions.append("list_date = ?")
+            params.append(ListDate.to_key(list_date))
+        where = " AND ".join(conditions) or "1=1"
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        
+        cursor.execute(f"SELECT * FROM quarantine WHERE {where} ORDER BY list_date, program, row", params)
+        return [self._with_label(dict(row)) for row in cursor.fetchall()]
+    
+    def get_quality_report(self) -> List[Dict]:
+        """Число строк в карантине по спискам и правилам проверки"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        
+        cursor.execute('''
+            SELECT program, list_date, rule, COUNT(*) AS rows
+            FROM quarantine
+            GROUP BY list_date, program, rule
+            ORDER BY list_date, program, rule
+        ''')
+        return [self._with_label(dict(row)) for row in cursor.fetchall()]
+    
+    def get_ingest_manifest(self) -> List[Dict]:
+        """Загруженные списки и версии файлов, из которых они загружены"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        
+        cursor.execute("SELECT * FROM ingest_manifest ORDER BY list_date, program")
+        return [self._with_label(dict(row)) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _list_records(columns, program: int, list_date: int):
+        """Строки для _insert_applicants из проверенных колонок списка"""
+        row_count = len(columns['id'])
+        return zip(
+            columns['id'].tolist(),
+            [program] * row_count,
+            [list_date] * row_count,
+            columns['consent'].astype(np.int64).tolist(),
+            columns['priority'].tolist(),
+            columns['physics_score'].tolist(),
+            columns['russian_score'].tolist(),
+            columns['math_score'].tolist(),
+            columns['achievements_score'].tolist(),
+            columns['total_score'].tolist()
+        )
+    
+    def _write_list(self, cursor, result: IngestResult, program: int, list_date: int, columns, mode: str,
+                    digest: str = None):
+        """Запись проверенного списка (программа, дата) в текущей транзакции.
+        
+        digest - хэш файла для манифеста загрузок.
+        """
+        records = self._list_records(columns, program, list_date)
+        if mode == "diff":
+            result.inserted, result.updated, result.deleted = self._apply_list_diff(
+                cursor, program, list_date, records
             )
-            
-            for _, row in df.iterrows():
-                try:
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO applicants 
-                        (external_id, program, list_date, consent, priority, 
-                         physics_score, russian_score, math_score, 
-                         achievements_score, total_score)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        int(row['id']), program, list_date,
-                        bool(row['consent']), int(row['priority']),
-                        int(row['physics_score']), int(row['russian_score']),
-                        int(row['math_score']), int(row['achievements_score']),
-                        int(row['total_score'])
-                    ))
-                except Exception as e:
-                    print(f"Ошибка при вставке строки: {e}")
-                    continue
-            
+        else:
+            result.deleted = self._delete_rows(
+                cursor, "program = ? AND list_date = ?", (program, list_date)
+            )
+            self._lists_changed(cursor, [(program, list_date)])
+            self._insert_applicants(cursor, records)
+            self._refresh_summary(cursor, [(program, list_date)])
+            result.inserted = len(columns['id'])
+        result.loaded = len(columns['id'])
+        self._quarantine_rows(cursor, result, program, list_date)
+        if digest is not None:
+            self._record_manifest(cursor, result, program, list_date, digest)
+    
+    @staticmethod
+    def _files_size(filepaths) -> int:
+        """Суммарный размер файлов в байтах (недоступные файлы не учитываются)"""
+        total = 0
+        for filepath in filepaths:
+            try:
+                total += os.path.getsize(filepath)
+            except OSError:
+                pass
+        return total
+    
+    def load_date_files(self, filepaths, list_date: str, mode: str = "replace", workers: int = None,
+                        progress_callback=None, is_cancelled=None, force: bool = False) -> List[IngestResult]:
+        """Загрузка всех файлов одной даты.
+        
+        Файлы читаются и проверяются (parse_list_file) в пуле процессов, если их
+        суммарный размер не меньше PARALLEL_PARSE_MIN_BYTES, иначе - в одном
+        фоновом потоке. Готовые колонки по мере поступления записывает единственный
+        писатель - соединение текущего потока. Вся дата фиксируется одним COMMIT: при ошибке
+        записи или отмене (is_cancelled() вернула True) списки даты не меняются.
+        Файл, который не удалось прочитать, пропускается с ошибкой в своем результате,
+        а файл с хэшем из манифеста загрузок (если не задано force=True) - с skipped.
+        progress_callback(готово, всего) вызывается после каждого файла.
+        """
+        if mode not in self.INGEST_MODES:
+            raise ValueError(f"Неизвестный режим загрузки: {mode}")
+        results = [
+            IngestResult(filepath=filepath, program=self.program_from_filename(filepath), list_date=list_date)
+            for filepath in filepaths
+        ]
+        if not results:
+            return results
+        
+        list_key = ListDate.to_key(list_date)
+        # Словарь программ пополняется до открытия транзакции даты
+        program_keys = [self._program_key(result.program, create=True) for result in results]
+        known_hashes = [
+            None if force else self._manifest_hash(program_key, list_key) for program_key in program_keys
+        ]
+        
+        workers = min(len(results), workers or os.cpu_count() or 1)
+        if workers > 1 and self._files_size(filepaths) >= self.PARALLEL_PARSE_MIN_BYTES:
+            # spawn: дочерний процесс не наследует потоки Qt и соединения SQLite
+            executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            # Один поток разбора все равно совмещается с записью в SQLite
+            executor = ThreadPoolExecutor(1)
+        futures = {
+            executor.submit(self.parse_list_file, result.filepath, known_hashes[index]): index
+            for index, result in enumerate(results)
+        }
+        
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            for completed, future in enumerate(as_completed(futures), 1):
+                if is_cancelled and is_cancelled():
+                    raise InterruptedError("Загрузка отменена")
+                index = futures[future]
+                result = results[index]
+                digest, columns, result.rejected, result.error = future.result()
+                if result.error is not None:
+                    print(f"Ошибка загрузки CSV: {result.error}")
+                elif columns is None:
+                    result.skipped = True
+                else:
+                    self._write_list(cursor, result, program_keys[index], list_key, columns, mode, digest)
+                if progress_callback:
+                    progress_callback(completed, len(results))
             conn.commit()
-            conn.close()
-            return True
-            
+            if any(result.changed for result in results):
+                self.data_generation += 1
+        
         except Exception as e:
-            print(f"Ошибка загрузки CSV: {e}")
-            return False
+            conn.rollback()
+            for result in results:
+                result.loaded = result.inserted = result.updated = result.deleted = 0
+                result.error = result.error or str(e)
+            print(f"Загрузка за {list_date} отменена: {e}")
+            return results
+        
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        if sum(result.inserted + result.deleted for result in results) >= self.ANALYZE_ROW_THRESHOLD:
+            self.analyze()
+        return results
     
-    def get_applicants_with_filters(self, filters: List[FilterCondition] = None) -> List[Dict]:
-        """Получение списка абитуриентов с расширенной фильтрацией"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def load_csv_stream(self, filepath: str, list_date: str, chunk_rows: int = None,
+                        progress_callback=None, force: bool = False) -> IngestResult:
+        """Потоковая загрузка большого CSV файла частями по chunk_rows строк.
+        
+        Файл читается с узкими типами колонок (CSV_STREAM_DTYPES), каждая часть
+        проверяется и записывается сразу, в памяти между частями хранятся только
+        номера строк записанных id. Повтор id из прежней части обрабатывается, как
+        в load_csv_bulk: действует последняя строка, прежняя уходит в карантин.
+        Все части пишутся в одной транзакции: при ошибке список остается
+        прежним. progress_callback(строк, строк_в_секунду) вызывается после каждой части.
+        Файл с хэшем из манифеста загрузок пропускается, если не задано force=True.
+        """
+        import time
         
-        query = "SELECT * FROM applicants WHERE 1=1"
-        params = []
+        program = self.program_from_filename(filepath)
+        result = IngestResult(filepath=filepath, program=program, list_date=list_date)
+        chunk_rows = chunk_rows or self.STREAM_CHUNK_ROWS
         
-        if filters:
-            for filter_cond in filters:
-                sql_operator = filter_cond.logic.value
+        conn = self.get_connection()
+        try:
+            list_date = ListDate.to_key(list_date)
+            program_key = self._program_key(program, create=True)
+            lists = [(program_key, list_date)]
+            digest = self.file_digest(filepath)
+            if not force and digest == self._manifest_hash(program_key, list_date):
+                result.skipped = True
+                return result
+            start_time = time.time()
+            rows_read = 0
+            # Номер строки файла для каждого записанного id
+            seen = {}
+            
+            reader = pd.read_csv(
+                filepath, encoding='utf-8', dtype=self.CSV_STREAM_DTYPES, chunksize=chunk_rows
+            )
+            with conn, reader:
+                cursor = conn.cursor()
+                result.deleted = self._delete_rows(
+                    cursor, "program = ? AND list_date = ?", lists[0]
+                )
+                self._lists_changed(cursor, lists)
                 
-                if filter_cond.operator == "=":
-                    query += f" {sql_operator} {filter_cond.field} = ?"
-                    params.append(filter_cond.value)
-                elif filter_cond.operator == ">":
-                    query += f" {sql_operator} {filter_cond.field} > ?"
-                    params.append(filter_cond.value)
-                elif filter_cond.operator == "<":
-                    query += f" {sql_operator} {filter_cond.field} < ?"
-                    params.append(filter_cond.value)
-                elif filter_cond.operator == ">=":
-                    query += f" {sql_operator} {filter_cond.field} >= ?"
-                    params.append(filter_cond.value)
-                elif filter_cond.operator == "<=":
-                    query += f" {sql_operator} {filter_cond.field} <= ?"
-                    params.append(filter_cond.value)
-                elif filter_cond.operator == "!=":
-                    query += f" {sql_operator} {filter_cond.field} != ?"
-                    params.append(filter_cond.value)
-                elif filter_cond.operator == "IN":
-                    if isinstance(filter_cond.value, (list, tuple)):
-                        placeholders = ','.join(['?'] * len(filter_cond.value))
-                        query += f" {sql_operator} {filter_cond.field} IN ({placeholders})"
-                        params.extend(filter_cond.value)
+                for chunk in reader:
+                    columns, valid, rejected = self.validate_applicants_frame(chunk, rows_read + 2)
+                    result.rejected.extend(rejected)
+                    
+                    columns = {name: values[valid] for name, values in columns.items()}
+                    ids = columns['id'].tolist()
+                    repeated = [external_id for external_id in ids if external_id in seen]
+                    if repeated:
+                        result.rejected.extend(
+                            self._replaced_rows(cursor, program_key, list_date, repeated, seen)
+                        )
+                    seen.update(zip(ids, (np.flatnonzero(valid) + rows_read + 2).tolist()))
+                    rows_read += len(chunk)
+                    self._insert_applicants(cursor, self._list_records(columns, program_key, list_date))
+                    
+                    if progress_callback:
+                        elapsed = time.time() - start_time
+                        progress_callback(rows_read, rows_read / elapsed if elapsed > 0 else 0.0)
+                
+                # Записано по одной строке на id: замененные повторы не считаются
+                result.loaded = len(seen)
+                result.rejected.sort(key=lambda rejected: rejected.row)
+                self._refresh_summary(cursor, lists)
+                self._quarantine_rows(cursor, result, program_key, list_date)
+                self._record_manifest(cursor, result, program_key, list_date, digest)
+            self.data_generation += 1
+            
+            result.inserted = result.loaded
+            if result.inserted + result.deleted >= self.ANALYZE_ROW_THRESHOLD:
+                self.analyze()
         
-        query += " ORDER BY total_score DESC, external_id"
+        except Exception as e:
+            result.loaded = result.inserted = result.deleted = 0
+            result.error = str(e)
+            print(f"Ошибка потоковой загрузки CSV: {e}")
+        
+        return result
+    
+    def _replaced_rows(self, cursor, program: int, list_date: int, external_ids, seen: dict):
+        """Отклоненные строки для записанных ранее id, которые заменит повтор из новой части файла"""
+        replaced = []
+        for external_id in external_ids:
+            stored = cursor.execute('''
+                SELECT consent, priority, physics_score, russian_score, math_score,
+                       achievements_score, total_score
+                FROM applicants WHERE external_id = ? AND program = ? AND list_date = ?
+            ''', (external_id, program, list_date)).fetchone()
+            values = [external_id, bool(stored[0]), *stored[1:]]
+            replaced.append(RejectedRow(
+                row=seen[external_id], external_id=external_id,
+                reason="повтор id в файле (действует последняя строка)", rule="duplicate",
+                raw=','.join(str(value) for value in values)
+            ))
+        return replaced
+    
+    def _filter_clause(self, filters=None):
+        """Условие WHERE и параметры для списка фильтров или FilterGroup"""
+        return FilterCompiler.to_sql(self._encode_programs(FilterCompiler.normalize(filters)))
+    
+    def _encode_programs(self, node):
+        """Дерево фильтров с кодами словаря programs вместо названий программ"""
+        if isinstance(node, FilterGroup):
+            return FilterGroup(node.logic, [self._encode_programs(item) for item in node.items])
+        if node.field != "program":
+            return node
+        FilterCompiler.validate(node)
+        if node.operator in ("=", "!="):
+            return FilterCondition(node.field, node.operator, self._program_key(node.value), node.logic)
+        # Остальные операторы проверяются по названиям и сводятся к IN по кодам
+        operand = FilterCompiler.value(node)
+        self._load_programs()
+        keys = [
+            key for key, name in self._program_names.items()
+            if ApplicantsSnapshot._compare(name, node.operator, operand)
+        ]
+        return FilterCondition(node.field, "IN", keys, node.logic)
+    
+    def _projection(self, columns=None) -> str:
+        """Список колонок для SELECT (по белому списку APPLICANT_COLUMNS)"""
+        if columns is None:
+            return "*"
+        for column in columns:
+            if column not in self.APPLICANT_COLUMNS:
+                raise ValueError(f"Недопустимая колонка: {column}")
+        return ", ".join(columns)
+    
+    @staticmethod
+    def _order_terms(columns, table: str, direction: str = "") -> str:
+        """Список колонок для ORDER BY: программа упорядочивается по названию,
+        как категории в ApplicantsSnapshot, а не по ключу словаря programs"""
+        terms = []
+        for column in columns:
+            if column == 'program':
+                column = f"(SELECT name FROM programs WHERE programs.id = {table}.program)"
+            terms.append(f"{column} {direction}".rstrip())
+        return ", ".join(terms)
+    
+    def get_applicants_with_filters(self, filters: List[FilterCondition] = None, columns=None,
+                                    limit: int = None) -> List[Dict]:
+        """Получение списка абитуриентов с расширенной фильтрацией"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        
+        where, params = self._filter_clause(filters)
+        query = (f"SELECT {self._projection(columns)} FROM applicants WHERE {where} "
+                 f"ORDER BY total_score DESC, external_id")
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
         
         cursor.execute(query, params)
         rows = cursor.fetchall()
         
         result = []
         for row in rows:
-            result.append(dict(row))
+            result.append(self._with_label(dict(row)))
         
-        conn.close()
         return result
     
-    def calculate_pass_score(self, program: str, list_date: str) -> Optional[int]:
-        """Расчет проходного балла для программы"""
-        filters = [
-            FilterCondition("program", "=", program, LogicOperator.AND),
-            FilterCondition("list_date", "=", list_date, LogicOperator.AND),
-            FilterCondition("consent", "=", 1, LogicOperator.AND)
-        ]
+    def _with_label(self, row: Dict) -> Dict:
+        """Дата списка и программа в строке результата - в виде ДД.ММ и названия"""
+        if 'list_date' in row:
+            row['list_date'] = ListDate.to_label(row['list_date'])
+        if 'program' in row:
+            row['program'] = self._program_name(row['program'])
+        return row
+    
+    # Ключ постраничной выборки: порядок total_score DESC, external_id, id
+    PAGE_KEY_COLUMNS = ('total_score', 'external_id', 'id')
+    
+    def get_applicants_page(self, filters: List[FilterCondition] = None, columns=None,
+                            limit: int = 1000, after: tuple = None):
+        """Страница абитуриентов после ключа after (keyset-пагинация).
+        
+        Возвращает (строки, ключ следующей страницы или None).
+        """
+        columns = list(columns) if columns is not None else list(self.APPLICANT_COLUMNS)
+        select = columns + [column for column in self.PAGE_KEY_COLUMNS if column not in columns]
+        key_positions = [select.index(column) for column in self.PAGE_KEY_COLUMNS]
+        
+        where, params = self._filter_clause(filters)
+        if after is not None:
+            # Первое условие задает начало диапазона по idx_applicants_score
+            total_score, external_id, applicant_id = after
+            where = (f"({where}) AND total_score <= ? AND "
+                     f"(total_score < ? OR (external_id, id) > (?, ?))")
+            params += [total_score, total_score, external_id, applicant_id]
+        
+        cursor = self.get_connection().cursor()
+        cursor.execute(
+            f"SELECT {self._projection(select)} FROM applicants WHERE {where} "
+            f"ORDER BY total_score DESC, external_id, id LIMIT ?",
+            params + [limit]
+        )
+        rows = cursor.fetchall()
+        
+        page = [self._with_label(dict(zip(columns, row))) for row in rows]
+        next_key = None
+        if len(rows) == limit:
+            next_key = tuple(rows[-1][position] for position in key_positions)
+        return page, next_key
+    
+    def iter_applicants(self, filters: List[FilterCondition] = None, columns=None, page_size: int = 1000):
+        """Потоковый обход абитуриентов по страницам: в памяти не больше одной страницы"""
+        after = None
+        while True:
+            page, after = self.get_applicants_page(filters, columns, page_size, after)
+            yield from page
+            if after is None:
+                return
+    
+    # Разрезы сводки в порядке idx_applicants_rank: группировка по ним
+    # обходит покрывающий индекс без временного B-дерева
+    AGGREGATE_DIMENSIONS = ('list_date', 'program', 'consent', 'priority')
+    
+    def aggregate_applicants(self, filters: List[FilterCondition] = None, group_by=(),
+                             value: str = "total_score") -> List[Dict]:
+        """Количество, сумма, минимум, максимум и среднее value по группам.
+        
+        Фильтры те же, что у выборок строк. Без group_by возвращается одна
+        строка по всем подходящим абитуриентам. Если фильтры и группировка
+        затрагивают только разрезы сводки, агрегаты по total_score читаются
+        из applicants_summary без обхода applicants.
+        """
+        group_by = list(group_by)
+        groups = self._projection(group_by) if group_by else ""
+        value_column = self._projection([value])
+        
+        where, params = self._filter_clause(filters)
+        dimensions = set(group_by) | FilterCompiler.fields(FilterCompiler.normalize(filters))
+        if value == "total_score" and dimensions <= set(self.AGGREGATE_DIMENSIONS):
+            source = "applicants_summary"
+            query = (f"SELECT {groups + ', ' if groups else ''}COALESCE(SUM(applications), 0), "
+                     f"SUM(score_sum), MIN(score_min), MAX(score_max) "
+                     f"FROM {source} WHERE {where}")
+        else:
+            source = "applicants"
+            query = (f"SELECT {groups + ', ' if groups else ''}COUNT(*), SUM({value_column}), "
+                     f"MIN({value_column}), MAX({value_column}) FROM {source} WHERE {where}")
+        if groups:
+            query += f" GROUP BY {groups} ORDER BY {self._order_terms(group_by, source)}"
         
-        applicants = self.get_applicants_with_filters(filters)
+        cursor = self.get_connection().cursor()
+        cursor.execute(query, params)
         
-        if not applicants:
-            return None
+        result = []
+        for row in cursor.fetchall():
+            entry = self._with_label(dict(zip(group_by, row)))
+            entry.update(self._aggregate_entry(*row[len(group_by):]))
+            result.append(entry)
+        return result
+    
+    @staticmethod
+    def _aggregate_entry(count, total, minimum, maximum) -> Dict:
+        """Словарь агрегатов группы; среднее считается из суммы и количества"""
+        return {
+            'count': count,
+            'sum': total or 0,
+            'min': minimum,
+            'max': maximum,
+            'mean': total / count if count else None,
+        }
+    
+    @staticmethod
+    def _merge_aggregates(target: Dict, entry: Dict):
+        """Добавление агрегатов группы entry к накопленным target"""
+        target['count'] += entry['count']
+        target['sum'] += entry['sum']
+        for key, pick in (('min', min), ('max', max)):
+            if entry[key] is not None:
+                target[key] = entry[key] if target[key] is None else pick(target[key], entry[key])
+        target['mean'] = target['sum'] / target['count'] if target['count'] else None
+    
+    def get_score_histogram(self, filters: List[FilterCondition] = None) -> Dict[int, int]:
+        """Гистограмма total_score из сводной таблицы: нижняя граница корзины -> количество.
+        
+        Фильтры допускаются только по разрезам сводки (дата, программа, согласие, приоритет).
+        """
+        if not FilterCompiler.fields(FilterCompiler.normalize(filters)) <= set(self.AGGREGATE_DIMENSIONS):
+            raise ValueError("Гистограмма фильтруется только по дате, программе, согласию и приоритету")
+        where, params = self._filter_clause(filters)
+        cursor = self.get_connection().cursor()
+        cursor.execute(
+            f"SELECT bucket, SUM(applications) FROM applicants_score_histogram "
+            f"WHERE {where} GROUP BY bucket ORDER BY bucket",
+            params
+        )
+        return {bucket * self.SCORE_BUCKET_WIDTH: count for bucket, count in cursor.fetchall()}
+    
+    def summarize_applicants(self, filters: List[FilterCondition] = None,
+                             value: str = "total_score") -> Dict:
+        """Итоги и разбивки по дате, программе, согласию и приоритету за один запрос.
+        
+        Возвращает {'total': агрегаты, 'list_date': {дата: агрегаты}, 'program': {...},
+        'consent': {...}, 'priority': {...}}.
+        """
+        summary = {'total': self._aggregate_entry(0, 0, None, None)}
+        for dimension in self.AGGREGATE_DIMENSIONS:
+            summary[dimension] = {}
+        
+        for row in self.aggregate_applicants(filters, self.AGGREGATE_DIMENSIONS, value):
+            self._merge_aggregates(summary['total'], row)
+            for dimension in self.AGGREGATE_DIMENSIONS:
+                breakdown = summary[dimension]
+                if row[dimension] not in breakdown:
+                    breakdown[row[dimension]] = self._aggregate_entry(0, 0, None, None)
+                self._merge_aggregates(breakdown[row[dimension]], row)
+        return summary
+    
+    def get_trend(self, date_from: str, date_to: str, programs: List[str] = None) -> List[Dict]:
+        """Агрегаты по дням и программам за диапазон дат (BETWEEN по индексу)"""
+        filters = [FilterCondition("list_date", "BETWEEN", (date_from, date_to))]
+        if programs is not None:
+            filters.append(FilterCondition("program", "IN", list(programs)))
+        return self.aggregate_applicants(filters, group_by=('list_date', 'program'))
+    
+    def count_applicants(self, filters: List[FilterCondition] = None) -> int:
+        """Количество абитуриентов по фильтрам"""
+        return self.aggregate_applicants(filters)[0]['count']
+    
+    def get_applicant_ids(self, filters: List[FilterCondition] = None, order_by: str = "total_score",
+                          descending: bool = True) -> np.ndarray:
+        """Упорядоченные ID абитуриентов по фильтрам (без загрузки остальных колонок)"""
+        if order_by not in self.APPLICANT_COLUMNS:
+            raise ValueError(f"Недопустимая колонка сортировки: {order_by}")
+        
+        where, params = self._filter_clause(filters)
+        direction = "DESC" if descending else "ASC"
+        cursor = self.get_connection().cursor()
+        cursor.execute(
+            f"SELECT id FROM applicants WHERE {where} "
+            f"ORDER BY {self._order_terms([order_by], 'applicants', direction)}, external_id",
+            params
+        )
+        return np.fromiter(itertools.chain.from_iterable(cursor), dtype=np.int64)
+    
+    def get_applicants_by_ids(self, ids) -> Dict[int, tuple]:
+        """Строки абитуриентов (в порядке APPLICANT_COLUMNS) по списку ID"""
+        ids = [int(applicant_id) for applicant_id in ids]
+        if not ids:
+            return {}
+        cursor = self.get_connection().cursor()
+        cursor.execute(
+            f"SELECT {', '.join(self.APPLICANT_COLUMNS)} FROM applicants "
+            f"WHERE id IN ({', '.join('?' * len(ids))})",
+            ids
+        )
+        date_position = self.APPLICANT_COLUMNS.index('list_date')
+        program_position = self.APPLICANT_COLUMNS.index('program')
+        result = {}
+        for row in cursor.fetchall():
+            row = list(row)
+            row[date_position] = ListDate.to_label(row[date_position])
+            row[program_position] = self._program_name(row[program_position])
+            result[row[0]] = tuple(row)
+        return result
+    
+    def get_snapshot(self, list_date: Optional[str] = None) -> ApplicantsSnapshot:
+        """Колоночный снимок за дату; перечитывается после загрузок и удалений"""
+        if list_date is not None:
+            list_date = ListDate.to_key(list_date)
+        conn = self.get_connection()
+        if conn.in_transaction:
+            # Снимок незафиксированной записи не кэшируем (см. get_count_matrix)
+            return ApplicantsSnapshot.load(conn.cursor(), list_date, None)
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            if (snapshot is None or snapshot.list_date != list_date
+                    or snapshot.generation != self.data_generation):
+                # Поколение читается до данных, как в get_count_matrix
+                generation = self.data_generation
+                snapshot = ApplicantsSnapshot.load(conn.cursor(), list_date, generation)
+                self._snapshot = snapshot
+            return snapshot
+    
+    def get_count_matrix(self) -> CountMatrix:
+        """Матрица количеств заявлений; перечитывается после загрузок и удалений"""
+        conn = self.get_connection()
+        if conn.in_transaction:
+            # Внутри незафиксированной записи видны данные, которых может не стать
+            # после отката: такую матрицу не кэшируем
+            return CountMatrix.load(conn.cursor(), None)
+        with self._count_matrix_lock:
+            matrix = self._count_matrix
+            if matrix is None or matrix.generation != self.data_generation:
+                # Поколение читается до данных: запись, зафиксированная во время
+                # чтения, увеличит его, и матрица будет перечитана
+                generation = self.data_generation
+                matrix = CountMatrix.load(conn.cursor(), generation)
+                self._count_matrix = matrix
+            return matrix
+    
+    def fetch_rank_arrays(self, program: str, list_date: str):
+        """Приоритеты и суммарные баллы абитуриентов с согласием (numpy-массивы)"""
+        cursor = self.get_connection().cursor()
+        cursor.execute(
+            "SELECT priority, total_score FROM applicants "
+            "WHERE list_date = ? AND program = ? AND consent = 1",
+            (ListDate.to_key(list_date), self._program_key(program))
+        )
+        rows = cursor.fetchall()
+        values = np.fromiter(
+            itertools.chain.from_iterable(rows), dtype=np.int64, count=2 * len(rows)
+        ).reshape(-1, 2)
+        return values[:, 0], values[:, 1]
+    
+    def save_pass_score(self, program: str, list_date: str, result: PassScoreResult, cursor=None,
+                        fingerprint: str = None):
+        """Запись проходного балла и статистики по программе"""
+        own_transaction = cursor is None
+        if own_transaction:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+        list_date = ListDate.to_key(list_date)
+        program = self._program_key(program)
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO pass_scores (program, list_date, pass_score, source_fingerprint)
+            VALUES (?, ?, ?, ?)
+        ''', (program, list_date, result.pass_score, fingerprint))
+        
+        # При недоборе сохраняется только отпечаток, а статистика прежнего
+        # расчета удаляется, чтобы не описывать уже не заполненную программу
+        if result.pass_score is None:
+            cursor.execute(
+                "DELETE FROM statistics WHERE program = ? AND list_date = ?", (program, list_date)
+            )
+        else:
+            cursor.execute('''
+                INSERT OR REPLACE INTO statistics 
+                (program, list_date, total_applications,
+                 priority_1_apps, priority_2_apps, priority_3_apps, priority_4_apps,
+                 priority_1_admitted, priority_2_admitted, priority_3_admitted, priority_4_admitted)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                program, list_date, result.total_applications,
+                *result.priority_counts, *result.admitted_counts
+            ))
+        
+        if own_transaction:
+            conn.commit()
+    
+    def calculate_pass_scores(self, dates: List[str] = None, programs: List[str] = None,
+                              progress_callback=None, mode: str = "independent",
+                              only_changed: bool = False) -> Dict[str, Dict[str, Optional[int]]]:
+        """Пакетный расчет проходных баллов: один проход по индексу и одна транзакция.
+        
+        При only_changed=True пересчитываются только пары (дата, программа),
+        отпечаток данных которых отличается от сохраненного с проходным баллом.
+        """
+        if mode not in self.ADMISSION_MODES:
+            raise ValueError(f"Неизвестный режим зачисления: {mode}")
+        
+        programs = list(programs) if programs is not None else list(self.PROGRAM_PLACES)
+        dates = list(dates) if dates is not None else self.get_dates()
+        if not dates:
+            return {}
+        dates = [ListDate.to_key(date) for date in dates]
+        # Коды новых программ заводятся до транзакции записи результатов
+        keys = {program: self._program_key(program, create=True) for program in programs}
+        
+        fingerprints = self.list_fingerprints(mode, programs)
+        fresh = set()
+        if only_changed:
+            stored = self.stored_fingerprints()
+            fresh = {
+                (date, keys[program]) for date in dates for program in programs
+                if stored.get((date, keys[program])) == fingerprints.get((date, keys[program]), f"{mode}:0")
+            }
+            stale_dates = [
+                date for date in dates
+                if any((date, keys[program]) not in fresh for program in programs)
+            ]
+        else:
+            stale_dates = dates
         
-        applicants.sort(key=lambda x: (x['priority'], -x['total_score']))
+        conn = self.get_connection()
+        cursor = conn.cursor()
         
-        places = {
-            'ПМ': 40, 'ИВТ': 50, 'ИТСС': 30, 'ИБ': 20
-        }.get(program, 0)
+        if mode == "independent" and stale_dates:
+            counts = self._priority_counts(cursor, stale_dates)
         
-        admitted = []
-        current_priority = 1
+        total_tasks = len(dates) * len(programs)
+        completed = 0
+        pass_scores = {}
+        computed = []
         
-        while current_priority <= 4 and len(admitted) < places:
-            priority_applicants = [a for a in applicants if a['priority'] == current_priority]
-            priority_applicants.sort(key=lambda x: -x['total_score'])
+        for date in dates:
+            pass_scores[date] = {}
+            if mode == "cross_program" and date in stale_dates:
+                date_results = self._cross_program_results(cursor, date)
             
-            for applicant in priority_applicants:
-                if len(admitted) < places:
-                    admitted.append(applicant)
+            for program in programs:
+                if (date, keys[program]) in fresh:
+                    pass_scores[date][program] = None
                 else:
-                    break
-            current_priority += 1
-        
-        if len(admitted) < places:
-            return None
+                    if mode == "cross_program":
+                        result = date_results.get(program)
+                    else:
+                        result = self._independent_result(cursor, date, program, counts)
+                    
+                    result = result or PassScoreResult(None, 0)
+                    pass_scores[date][program] = result.pass_score
+                    computed.append((program, date, result))
+                
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, total_tasks)
+        
+        with conn:
+            for program, date, result in computed:
+                self.save_pass_score(
+                    program, date, result, cursor,
+                    fingerprints.get((date, keys[program]), f"{mode}:0")
+                )
         
-        pass_score = admitted[-1]['total_score']
+        # Для пропущенных пар возвращаем ранее сохраненные баллы
+        for date in {date for date, _ in fresh}:
+            saved = self.get_pass_scores_by_date(date)
+            for program in programs:
+                if (date, keys[program]) in fresh:
+                    pass_scores[date][program] = saved.get(program)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return {ListDate.to_label(date): scores for date, scores in pass_scores.items()}
+    
+    def _priority_counts(self, cursor, dates: Optional[List[int]]) -> Dict:
+        """Количество заявлений с согласием по (номер дня, код программы) и приоритетам"""
+        # Группировка повторяет порядок idx_applicants_rank, поэтому обходится
+        # без временного B-дерева; условие на consent проверяется ниже
+        query = "SELECT list_date, program, consent, priority, COUNT(*) FROM applicants"
+        params = []
+        if dates is not None:
+            query += f" WHERE list_date IN ({', '.join('?' * len(dates))})"
+            params.extend(dates)
+        query += " GROUP BY list_date, program, consent, priority"
+        cursor.execute(query, params)
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO pass_scores (program, list_date, pass_score)
-            VALUES (?, ?, ?)
-        ''', (program, list_date, pass_score))
+        # (дата, программа) -> [всего заявлений, заявлений по приоритетам 1-4]
+        counts = {}
+        for date, program, consent, priority, count in cursor.fetchall():
+            if consent != 1:
+                continue
+            entry = counts.setdefault((date, program), [0, np.zeros(4, dtype=np.int64)])
+            entry[0] += count
+            if 1 <= priority <= 4:
+                entry[1][priority - 1] = count
+        return counts
+    
+    def _independent_result(self, cursor, date: int, program: str, counts: Dict) -> Optional[PassScoreResult]:
+        """Проходной балл программы без учета зачисления на другие программы"""
+        key = self._program_key(program)
+        if (date, key) not in counts:
+            return None
         
-        total_apps = len(applicants)
-        priority_counts = {}
-        for i in range(1, 5):
-            priority_counts[i] = len([a for a in applicants if a['priority'] == i])
+        places = self.PROGRAM_PLACES.get(program, 0)
+        total_apps, priority_counts = counts[(date, key)]
+        admitted_counts = PassScoreCalculator.admitted_counts(priority_counts, places)
+        last = PassScoreCalculator.last_admitted(admitted_counts, places)
+        if last is None:
+            return None
         
-        admitted_counts = {}
-        for i in range(1, 5):
-            admitted_counts[i] = len([a for a in admitted if a['priority'] == i])
+        # k-й по убыванию балл последнего приоритета берем прямо из индекса
+        last_priority, k = last
+        cursor.execute(
+            "SELECT total_score FROM applicants "
+            "WHERE list_date = ? AND program = ? AND consent = 1 AND priority = ? "
+            "ORDER BY total_score DESC LIMIT 1 OFFSET ?",
+            (date, key, last_priority, k - 1)
+        )
+        return PassScoreResult(
+            cursor.fetchone()[0], total_apps,
+            priority_counts.tolist(), admitted_counts.tolist()
+        )
+    
+    def _cross_program_results(self, cursor, date: int) -> Dict[str, PassScoreResult]:
+        """Проходные баллы всех программ даты с зачислением по высшему приоритету"""
+        cursor.execute(
+            "SELECT external_id, program, priority, total_score FROM applicants "
+            "WHERE list_date = ? AND consent = 1",
+            (date,)
+        )
+        applications = cursor.fetchall()
+        # Заявления приходят с кодами программ, места пересчитываются на коды
+        places = {self._program_key(program): count for program, count in self.PROGRAM_PLACES.items()}
+        admitted = CrossProgramAdmission.assign(applications, places)
+        
+        results = {}
+        for program in {row[1] for row in applications}:
+            results[program] = PassScoreResult(None, 0)
+        for _, program, priority, _ in applications:
+            result = results[program]
+            result.total_applications += 1
+            if 1 <= priority <= 4:
+                result.priority_counts[priority - 1] += 1
+        
+        for program, entries in admitted.items():
+            if not entries:
+                continue
+            result = results[program]
+            for entry in entries:
+                priority = entry[3]
+                if 1 <= priority <= 4:
+                    result.admitted_counts[priority - 1] += 1
+            # Проходной балл - минимальный среди зачисленных при заполненных местах
+            if len(entries) == places.get(program, 0):
+                result.pass_score = entries[0][0]
+        return {self._program_name(program): result for program, result in results.items()}
+    
+    def calculate_pass_score(self, program: str, list_date: str, engine: str = "numpy",
+                             mode: str = "independent") -> Optional[int]:
+        """Расчет проходного балла для программы"""
+        if engine not in self.PASS_SCORE_ENGINES:
+            raise ValueError(f"Неизвестный движок расчета: {engine}")
+        list_date = ListDate.to_key(list_date)
+        if mode == "cross_program":
+            # Зачисление зависит от всех программ даты, поэтому считаем дату целиком
+            results = self.calculate_pass_scores([list_date], [program], mode=mode)
+            return results[ListDate.to_label(list_date)][program]
+        if mode not in self.ADMISSION_MODES:
+            raise ValueError(f"Неизвестный режим зачисления: {mode}")
+        
+        places = self.PROGRAM_PLACES.get(program, 0)
+        
+        if engine == "numpy":
+            priorities, totals = self.fetch_rank_arrays(program, list_date)
+            result = PassScoreCalculator.numpy(priorities, totals, places)
+        else:
+            filters = [
+                FilterCondition("program", "=", program, LogicOperator.AND),
+                FilterCondition("list_date", "=", list_date, LogicOperator.AND),
+                FilterCondition("consent", "=", 1, LogicOperator.AND)
+            ]
+            applicants = self.get_applicants_with_filters(filters)
+            result = PassScoreCalculator.python(applicants, places)
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO statistics 
-            (program, list_date, total_applications,
-             priority_1_apps, priority_2_apps, priority_3_apps, priority_4_apps,
-             priority_1_admitted, priority_2_admitted, priority_3_admitted, priority_4_admitted)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            program, list_date, total_apps,
-            priority_counts.get(1, 0), priority_counts.get(2, 0),
-            priority_counts.get(3, 0), priority_counts.get(4, 0),
-            admitted_counts.get(1, 0), admitted_counts.get(2, 0),
-            admitted_counts.get(3, 0), admitted_counts.get(4, 0)
-        ))
+        if result.pass_score is None:
+            return None
         
-        conn.commit()
-        conn.close()
+        try:
+            fingerprint = self.list_fingerprints(mode, [program]).get((list_date, self._program_key(program)))
+            self.save_pass_score(program, list_date, result, fingerprint=fingerprint)
+        except Exception:
+            self.get_connection().rollback()
+            raise
         
-        return pass_score
+        return result.pass_score
     
     def get_pass_scores_by_date(self, list_date: str) -> Dict[str, Optional[int]]:
         """Получение проходных баллов по дате"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
             "SELECT program, pass_score FROM pass_scores WHERE list_date = ?",
-            (list_date,)
+            (ListDate.to_key(list_date),)
         )
         
         rows = cursor.fetchall()
@@ -842,97 +2867,228 @@ class EnhancedDatabase:
             result[program] = None
         
         for row in rows:
-            result[row[0]] = row[1]
+            result[self._program_name(row[0])] = row[1]
         
-        conn.close()
         return result
     
     def get_all_pass_scores(self) -> List[Dict]:
         """Получение всех проходных баллов"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         cursor.execute("SELECT * FROM pass_scores ORDER BY list_date, program")
         rows = cursor.fetchall()
-        result = [dict(row) for row in rows]
-        conn.close()
+        result = [self._with_label(dict(row)) for row in rows]
         return result
     
     def get_statistics(self, list_date: str) -> List[Dict]:
         """Получение статистики"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         cursor.execute(
             "SELECT * FROM statistics WHERE list_date = ? ORDER BY program",
-            (list_date,)
+            (ListDate.to_key(list_date),)
         )
         
         rows = cursor.fetchall()
-        result = [dict(row) for row in rows]
-        conn.close()
+        result = [self._with_label(dict(row)) for row in rows]
         return result
     
     def get_dates(self) -> List[str]:
         """Получение списка дат в базе"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT DISTINCT list_date FROM applicants ORDER BY list_date")
-        dates = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return dates
+        return list(self.get_count_matrix().dates)
     
     def get_applicants_count(self, program: str = None, date: str = None) -> int:
         """Получение количества абитуриентов"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = "SELECT COUNT(*) FROM applicants WHERE 1=1"
-        params = []
-        
-        if program:
-            query += " AND program = ?"
-            params.append(program)
-        
-        if date:
-            query += " AND list_date = ?"
-            params.append(date)
-        
-        cursor.execute(query, params)
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return self.get_count_matrix().count(program or None, date or None)
+
+# КЛАСС ДЛЯ ПОТОКА РАСЧЕТА ПРОХОДНЫХ БАЛЛОВ
+class CalculationThread(QThread):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal()
+    error = pyqtSignal(str)
+    
+    def __init__(self, db, dates, programs, mode="independent"):
+        super().__init__()
+        self.db = db
+        self.dates = dates
+        self.programs = programs
+        self.mode = mode
+    
+    def run(self):
+        try:
+            self.db.calculate_pass_scores(
+                self.dates, self.programs,
+                progress_callback=lambda completed, total: self.progress.emit(int((completed / total) * 100)),
+                mode=self.mode,
+                only_changed=True
+            )
+            
+            self.finished.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            # У рабочего потока собственное соединение - закрываем его
+            self.db.close_thread_connection()
+
+# КЛАСС ДЛЯ ПОТОКА ЗАГРУЗКИ БОЛЬШИХ CSV ФАЙЛОВ
+class IngestThread(QThread):
+    # Прочитано строк и скорость загрузки (строк в секунду)
+    progress = pyqtSignal(int, float)
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    
+    def __init__(self, db, filepath, list_date, force=False):
+        super().__init__()
+        self.db = db
+        self.filepath = filepath
+        self.list_date = list_date
+        self.force = force
+    
+    def run(self):
+        try:
+            result = self.db.load_csv_stream(
+                self.filepath, self.list_date,
+                progress_callback=lambda rows, rate: self.progress.emit(rows, rate),
+                force=self.force
+            )
+            if result.success:
+                self.finished.emit(result)
+            else:
+                self.error.emit(result.error)
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            self.db.close_thread_connection()
 
-# КЛАСС ДЛЯ ПОТОКА РАСЧЕТА ПРОХОДНЫХ БАЛЛОВ
-class CalculationThread(QThread):
+# КЛАСС ДЛЯ ПОТОКА ЗАГРУЗКИ ВСЕХ ФАЙЛОВ ЗА ДАТУ
+class DateIngestThread(QThread):
     progress = pyqtSignal(int)
-    finished = pyqtSignal()
+    finished = pyqtSignal(object)
     error = pyqtSignal(str)
     
-    def __init__(self, db, dates, programs):
+    def __init__(self, db, filepaths, list_date, force=False):
         super().__init__()
         self.db = db
-        self.dates = dates
+        self.filepaths = filepaths
+        self.list_date = list_date
+        self.force = force
+        self._cancelled = False
+    
+    def cancel(self):
+        """Отмена загрузки (вызывается из потока интерфейса)"""
+        self._cancelled = True
+    
+    def run(self):
+        try:
+            results = self.db.load_date_files(
+                self.filepaths, self.list_date, mode="diff",
+                progress_callback=lambda completed, total: self.progress.emit(int((completed / total) * 100)),
+                is_cancelled=lambda: self._cancelled,
+                force=self.force
+            )
+            self.finished.emit(results)
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            self.db.close_thread_connection()
+
+# КЛАСС ДЛЯ ПОТОКА АВТОЗАГРУЗКИ ИЗ НАБЛЮДАЕМОЙ ПАПКИ
+class WatchIngestThread(QThread):
+    # Результаты загрузки и даты, списки которых изменились
+    finished = pyqtSignal(object, object)
+    error = pyqtSignal(str)
+    
+    def __init__(self, db, files_by_date, programs, mode="independent"):
+        super().__init__()
+        self.db = db
+        self.files_by_date = files_by_date
         self.programs = programs
+        self.mode = mode
     
     def run(self):
         try:
-            total_tasks = len(self.dates) * len(self.programs)
-            completed = 0
-            
-            for date in self.dates:
-                for program in self.programs:
-                    self.db.calculate_pass_score(program, date)
-                    completed += 1
-                    progress = int((completed / total_tasks) * 100)
-                    self.progress.emit(progress)
+            results = []
+            changed_dates = []
+            for date, filepaths in self.files_by_date.items():
+                date_results = self.db.load_date_files(filepaths, date, mode="diff")
+                results.extend(date_results)
+                if any(result.changed for result in date_results):
+                    changed_dates.append(date)
+            
+            # Пересчитываются только даты с изменившимися списками,
+            # а внутри них - пары с устаревшим отпечатком данных
+            if changed_dates:
+                self.db.calculate_pass_scores(
+                    changed_dates, self.programs, mode=self.mode, only_changed=True
+                )
             
-            self.finished.emit()
+            self.finished.emit(results, changed_dates)
         except Exception as e:
             self.error.emit(str(e))
+        finally:
+            self.db.close_thread_connection()
+
+# КЛАСС ДЛЯ ПОТОКА ФИЛЬТРАЦИИ
+class FilterQueryThread(QThread):
+    finished = pyqtSignal(int, object, float)
+    error = pyqtSignal(int, str)
+    
+    def __init__(self, db, filters, order_by, descending, generation, snapshot_date=None):
+        super().__init__()
+        self.db = db
+        self.filters = filters
+        self.order_by = order_by
+        self.descending = descending
+        self.generation = generation
+        # Дата колоночного снимка; None - запрос к SQLite
+        self.snapshot_date = snapshot_date
+        self._connection = None
+        # Защищает _connection: соединение не закрывается во время interrupt()
+        self._connection_lock = threading.Lock()
+        self._cancelled = False
+    
+    def cancel(self):
+        """Прерывание выполняемого запроса (вызывается из потока интерфейса)"""
+        self._cancelled = True
+        with self._connection_lock:
+            connection = self._connection
+            if connection is None:
+                return
+            try:
+                connection.interrupt()
+            except sqlite3.ProgrammingError:
+                # Соединение уже закрыто - прерывать нечего
+                pass
+    
+    def run(self):
+        import time
+        start_time = time.time()
+        try:
+            with self._connection_lock:
+                self._connection = self.db.get_connection()
+            if self._cancelled:
+                return
+            if self.snapshot_date:
+                snapshot = self.db.get_snapshot(self.snapshot_date)
+                ids = snapshot.filter_ids(self.filters, self.order_by, self.descending)
+            else:
+                ids = self.db.get_applicant_ids(self.filters, self.order_by, self.descending)
+            if not self._cancelled:
+                self.finished.emit(self.generation, ids, time.time() - start_time)
+        except sqlite3.OperationalError as e:
+            # Прерванный запрос устарел - результат никому не нужен
+            if not self._cancelled:
+                self.error.emit(self.generation, str(e))
+        except Exception as e:
+            self.error.emit(self.generation, str(e))
+        finally:
+            with self._connection_lock:
+                self._connection = None
+            self.db.close_thread_connection()
 
 # КЛАСС ДЛЯ ПОТОКА ГЕНЕРАЦИИ ОТЧЕТОВ
 class ReportGenerationThread(QThread):
@@ -1234,6 +3390,8 @@ class ReportGenerationThread(QThread):
         except Exception as e:
             error_details = traceback.format_exc()
             self.error.emit(f"Ошибка при создании отчета: {str(e)}\n\n{error_details}")
+        finally:
+            self.db.close_thread_connection()
 
 # КЛАСС ГРАФИКА (MATPLOTLIB)
 class MplCanvas(FigureCanvas):
@@ -1268,11 +3426,130 @@ class TestReportDialog(QDialog):
 
 
 
+# МОДЕЛЬ ТАБЛИЦЫ АБИТУРИЕНТОВ
+class ApplicantsTableModel(QAbstractTableModel):
+    """Виртуальная таблица: в памяти только упорядоченные ID, строки
+    подгружаются блоками при отрисовке и форматируются по запросу"""
+    
+    # Пользователь сменил сортировку - нужен новый запрос ID
+    sort_changed = pyqtSignal()
+    
+    HEADERS = [
+        'ID', 'Программа', 'Дата', 'Согласие', 'Приоритет',
+        'Физика/ИКТ', 'Русский', 'Математика', 'Достижения', 'Сумма', 'Внешний ID'
+    ]
+    # Строк в одном блоке и число блоков в кэше
+    BLOCK_SIZE = 256
+    CACHE_BLOCKS = 64
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.db = None
+        self.filters = []
+        self.ids = np.empty(0, dtype=np.int64)
+        self.sort_column = EnhancedDatabase.APPLICANT_COLUMNS.index('total_score')
+        self.sort_order = Qt.SortOrder.DescendingOrder
+        self._blocks = OrderedDict()
+    
+    def sort_key(self):
+        """Колонка и направление сортировки для запроса ID"""
+        return (
+            EnhancedDatabase.APPLICANT_COLUMNS[self.sort_column],
+            self.sort_order == Qt.SortOrder.DescendingOrder
+        )
+    
+    def set_result(self, db, filters: List[FilterCondition], ids: np.ndarray):
+        """Подмена результата готовым набором ID и сброс кэша строк"""
+        self.beginResetModel()
+        self.db = db
+        self.filters = filters
+        self.ids = ids
+        self._blocks.clear()
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ids)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.display_text(index.row(), index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+    
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Сортировка выполняется запросом к базе (см. FilterQueryThread)"""
+        if (column, order) == (self.sort_column, self.sort_order):
+            return
+        self.sort_column = column
+        self.sort_order = order
+        self.sort_changed.emit()
+    
+    def row_values(self, row: int) -> Optional[tuple]:
+        """Значения строки в порядке APPLICANT_COLUMNS (None, если строка удалена)"""
+        block_index, offset = divmod(row, self.BLOCK_SIZE)
+        block = self._blocks.get(block_index)
+        if block is None:
+            block = self._load_block(block_index)
+        else:
+            self._blocks.move_to_end(block_index)
+        return block[offset]
+    
+    def display_text(self, row: int, column: int) -> str:
+        """Текст ячейки"""
+        values = self.row_values(row)
+        if values is None:
+            return ""
+        value = values[column]
+        if EnhancedDatabase.APPLICANT_COLUMNS[column] == 'consent':
+            return "Да" if value else "Нет"
+        return str(value)
+    
+    def _load_block(self, block_index: int) -> List[Optional[tuple]]:
+        """Загрузка блока строк одним запросом с вытеснением старых блоков"""
+        start = block_index * self.BLOCK_SIZE
+        block_ids = self.ids[start:start + self.BLOCK_SIZE]
+        rows = self.db.get_applicants_by_ids(block_ids)
+        block = [rows.get(int(applicant_id)) for applicant_id in block_ids]
+        
+        self._blocks[block_index] = block
+        if len(self._blocks) > self.CACHE_BLOCKS:
+            self._blocks.popitem(last=False)
+        return block
+
 # КЛАСС ГЛАВНОГО ОКНА
 class MainWindow(QMainWindow):
+    # Класс базы данных окна (подклассы подставляют расширенную базу)
+    DATABASE_CLASS = EnhancedDatabase
+    # Профиль хранения базы: WAL для параллельной работы интерфейса и потоков
+    STORAGE_PROFILE = "concurrent"
+    # Интервал фоновой контрольной точки WAL (мс)
+    CHECKPOINT_INTERVAL = 60000
+    # Задержка перед запуском фильтрации после ввода (мс)
+    FILTER_DEBOUNCE_MS = 250
+    # Порог, после которого запрос считается медленным (мс)
+    SLOW_QUERY_MS = 3000
+    # Наблюдаемая папка со списками ДД.ММ_Программа.csv
+    WATCH_DIR = 'data'
+    # Интервал опроса наблюдаемой папки (мс)
+    WATCH_POLL_MS = 2000
+    # Тишина после последнего изменения файлов перед загрузкой (мс):
+    # пачка файлов дает одну загрузку и одно обновление интерфейса
+    WATCH_COALESCE_MS = 3000
+    
     def __init__(self):
         super().__init__()
-        self.db = EnhancedDatabase()
+        self.db = self.DATABASE_CLASS(storage_profile=self.STORAGE_PROFILE)
         
         self.programs = {
             'ПМ': 'Прикладная математика',
@@ -1281,7 +3558,7 @@ class MainWindow(QMainWindow):
             'ИБ': 'Информационная безопасность'
         }
         self.setWindowIcon(QIcon("icon.ico"))
-        self.places = {'ПМ': 40, 'ИВТ': 50, 'ИТСС': 30, 'ИБ': 20}
+        self.places = dict(EnhancedDatabase.PROGRAM_PLACES)
         
         self.filter_conditions = []
         self.current_logic_operator = LogicOperator.AND
@@ -1289,8 +3566,51 @@ class MainWindow(QMainWindow):
         
         self.score_filters = {}
         
+        # Фоновая фильтрация: номер поколения отбрасывает устаревшие результаты
+        self.filter_generation = 0
+        self.filter_threads = []
+        self.filter_debounce_timer = QTimer(self)
+        self.filter_debounce_timer.setSingleShot(True)
+        self.filter_debounce_timer.setInterval(self.FILTER_DEBOUNCE_MS)
+        self.filter_debounce_timer.timeout.connect(self.apply_filters)
+        self.slow_query_timer = QTimer(self)
+        self.slow_query_timer.setSingleShot(True)
+        self.slow_query_timer.setInterval(self.SLOW_QUERY_MS)
+        self.slow_query_timer.timeout.connect(self.on_filter_slow)
+        
         self.init_ui()
         self.load_data()
+        
+        # Периодическая контрольная точка, чтобы журнал WAL не разрастался
+        self.checkpoint_timer = QTimer(self)
+        self.checkpoint_timer.timeout.connect(lambda: self.db.checkpoint())
+        self.checkpoint_timer.start(self.CHECKPOINT_INTERVAL)
+        
+        # Наблюдение за папкой данных: опрос и отложенная загрузка изменений
+        self.watch_state = {}
+        self.watch_pending = set()
+        self.watch_poll_timer = QTimer(self)
+        self.watch_poll_timer.setInterval(self.WATCH_POLL_MS)
+        self.watch_poll_timer.timeout.connect(self.scan_watch_dir)
+        self.watch_coalesce_timer = QTimer(self)
+        self.watch_coalesce_timer.setSingleShot(True)
+        self.watch_coalesce_timer.setInterval(self.WATCH_COALESCE_MS)
+        self.watch_coalesce_timer.timeout.connect(self.ingest_watched_files)
+    
+    def closeEvent(self, event):
+        """Закрытие соединений с базой при выходе из программы"""
+        self.watch_poll_timer.stop()
+        self.watch_coalesce_timer.stop()
+        ingest_thread = getattr(self, 'ingest_thread', None)
+        if isinstance(ingest_thread, DateIngestThread):
+            ingest_thread.cancel()
+        for thread_name in ('calculation_thread', 'report_thread', 'ingest_thread', 'watch_thread'):
+            thread = getattr(self, thread_name, None)
+            if thread is not None and thread.isRunning():
+                thread.wait()
+        self.stop_filter_threads()
+        self.db.close()
+        super().closeEvent(event)
     
     def init_ui(self):
         self.setWindowTitle("ВУЗ-Assist")
@@ -1471,20 +3791,24 @@ class MainWindow(QMainWindow):
         table_tab = QWidget()
         table_layout = QVBoxLayout(table_tab)
         
-        # Таблица абитуриентов
-        self.table_widget = QTableWidget()
-        self.table_widget.setColumnCount(11)
-        self.table_widget.setHorizontalHeaderLabels([
-            'ID', 'Программа', 'Дата', 'Согласие', 'Приоритет', 
-            'Физика/ИКТ', 'Русский', 'Математика', 'Достижения', 'Сумма', 'Внешний ID'
-        ])
+        # Таблица абитуриентов (виртуальная модель)
+        self.applicants_model = ApplicantsTableModel(self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.applicants_model)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.verticalHeader().setDefaultSectionSize(24)
+        self.table_view.horizontalHeader().setSortIndicator(
+            self.applicants_model.sort_column, self.applicants_model.sort_order
+        )
+        self.table_view.setSortingEnabled(True)
+        self.applicants_model.sort_changed.connect(self.apply_filters)
         
         # Настройка ширины колонок
         column_widths = [50, 120, 80, 80, 70, 60, 70, 80, 80, 60, 80]
         for i, width in enumerate(column_widths):
-            self.table_widget.setColumnWidth(i, width)
+            self.table_view.setColumnWidth(i, width)
         
-        table_layout.addWidget(self.table_widget)
+        table_layout.addWidget(self.table_view)
         
         # Панель информации
         info_widget = QWidget()
@@ -1569,6 +3893,19 @@ class MainWindow(QMainWindow):
         load_single_action.triggered.connect(self.load_csv_dialog)
         file_menu.addAction(load_single_action)
         
+        load_stream_action = QAction("Потоковая загрузка большого CSV", self)
+        load_stream_action.triggered.connect(self.load_csv_stream_dialog)
+        file_menu.addAction(load_stream_action)
+        
+        self.force_reload_action = QAction("Перезагружать неизмененные файлы", self)
+        self.force_reload_action.setCheckable(True)
+        file_menu.addAction(self.force_reload_action)
+        
+        self.watch_action = QAction(f"Следить за папкой '{self.WATCH_DIR}'", self)
+        self.watch_action.setCheckable(True)
+        self.watch_action.toggled.connect(self.toggle_watch)
+        file_menu.addAction(self.watch_action)
+        
         clear_action = QAction("Очистить базу", self)
         clear_action.triggered.connect(self.clear_database)
         file_menu.addAction(clear_action)
@@ -1590,12 +3927,29 @@ class MainWindow(QMainWindow):
         calculate_action.triggered.connect(self.calculate_all_pass_scores)
         data_menu.addAction(calculate_action)
         
+        self.cross_program_action = QAction("Учитывать приоритеты между программами", self)
+        self.cross_program_action.setCheckable(True)
+        data_menu.addAction(self.cross_program_action)
+        
+        self.snapshot_filter_action = QAction("Фильтрация в памяти (снимок за дату)", self)
+        self.snapshot_filter_action.setCheckable(True)
+        self.snapshot_filter_action.toggled.connect(self.apply_filters)
+        data_menu.addAction(self.snapshot_filter_action)
+        
         data_menu.addSeparator()
         
         stats_action = QAction("Показать статистику БД", self)
         stats_action.triggered.connect(self.show_database_stats)
         data_menu.addAction(stats_action)
         
+        maintenance_action = QAction("Обслуживание индексов (ANALYZE)", self)
+        maintenance_action.triggered.connect(self.run_index_maintenance)
+        data_menu.addAction(maintenance_action)
+        
+        summary_check_action = QAction("Проверка сводной таблицы", self)
+        summary_check_action.triggered.connect(self.run_summary_check)
+        data_menu.addAction(summary_check_action)
+        
         # Меню Визуализация
         viz_menu = menubar.addMenu("Визуализация")
         
@@ -1657,7 +4011,19 @@ class MainWindow(QMainWindow):
     
     def on_date_changed(self, text):
         """Обработчик изменения даты"""
-        self.apply_filters()
+        self.schedule_filters()
+    
+    def stop_filter_threads(self):
+        """Прерывание и ожидание всех запросов фильтрации"""
+        self.filter_debounce_timer.stop()
+        for thread in self.filter_threads:
+            thread.cancel()
+            thread.wait()
+        self.filter_threads = []
+    
+    def schedule_filters(self):
+        """Отложенный запуск фильтрации: серия изменений дает один запрос"""
+        self.filter_debounce_timer.start()
     
     def on_logic_operator_changed(self, text):
         """Обработчик изменения логического оператора"""
@@ -1667,13 +4033,9 @@ class MainWindow(QMainWindow):
             self.current_logic_operator = LogicOperator.OR
     
     def build_filter_conditions(self):
-        """Построение списка условий фильтрации"""
+        """Построение дерева условий: дата И (остальные условия через выбранный оператор)"""
         conditions = []
         
-        date = self.date_combo.currentText()
-        if date:
-            conditions.append(FilterCondition("list_date", "=", date, LogicOperator.AND))
-        
         program = self.program_combo.currentText()
         if program != "Все программы":
             conditions.append(FilterCondition("program", "=", program, self.current_logic_operator))
@@ -1709,49 +4071,77 @@ class MainWindow(QMainWindow):
                     except ValueError:
                         pass
         
-        return conditions
+        # Оператор И/ИЛИ действует внутри группы и не выводит за пределы даты
+        tree = FilterGroup(LogicOperator.AND)
+        date = self.date_combo.currentText()
+        if date:
+            tree.items.append(FilterCondition("list_date", "=", date, LogicOperator.AND))
+        if conditions:
+            tree.items.append(FilterGroup(self.current_logic_operator, conditions))
+        return tree
     
     def apply_filters(self):
-        """Применение фильтров с замером времени"""
-        import time
-        start_time = time.time()
-        
-        filters = self.build_filter_conditions()
-        applicants = self.db.get_applicants_with_filters(filters)
+        """Применение фильтров в фоновом потоке с замером времени"""
+        self.filter_debounce_timer.stop()
+        
+        # Прерываем устаревшие запросы, таблица пока показывает прежний результат
+        for thread in self.filter_threads:
+            thread.cancel()
+        self.filter_threads = [thread for thread in self.filter_threads if thread.isRunning()]
+        
+        self.filter_generation += 1
+        self.filter_conditions = self.build_filter_conditions()
+        order_by, descending = self.applicants_model.sort_key()
+        
+        # Дата входит в дерево через И, поэтому результат не выходит за снимок даты
+        snapshot_date = None
+        if self.snapshot_filter_action.isChecked():
+            snapshot_date = self.date_combo.currentText() or None
+        
+        thread = FilterQueryThread(
+            self.db, self.filter_conditions, order_by, descending, self.filter_generation,
+            snapshot_date
+        )
+        thread.finished.connect(self.on_filter_finished)
+        thread.error.connect(self.on_filter_error)
+        self.filter_threads.append(thread)
+        
+        self.time_label.setText("Выполняется запрос...")
+        self.time_label.setStyleSheet("")
+        self.slow_query_timer.start()
+        thread.start()
+    
+    def on_filter_finished(self, generation, ids, elapsed_time):
+        """Результат фильтрации: применяем только последний запрос"""
+        if generation != self.filter_generation:
+            return
+        self.slow_query_timer.stop()
         
-        # Заполняем таблицу
-        self.table_widget.setRowCount(len(applicants))
-        
-        for row, app in enumerate(applicants):
-            consent_text = "Да" if app['consent'] else "Нет"
-            
-            items = [
-                QTableWidgetItem(str(app['id'])),
-                QTableWidgetItem(app['program']),
-                QTableWidgetItem(app['list_date']),
-                QTableWidgetItem(consent_text),
-                QTableWidgetItem(str(app['priority'])),
-                QTableWidgetItem(str(app['physics_score'])),
-                QTableWidgetItem(str(app['russian_score'])),
-                QTableWidgetItem(str(app['math_score'])),
-                QTableWidgetItem(str(app['achievements_score'])),
-                QTableWidgetItem(str(app['total_score'])),
-                QTableWidgetItem(str(app['external_id']))
-            ]
-            
-            for col, item in enumerate(items):
-                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.table_widget.setItem(row, col, item)
+        # Модель получает только ID, ячейки читаются при отрисовке
+        self.applicants_model.set_result(self.db, self.filter_conditions, ids)
         
-        elapsed_time = time.time() - start_time
-        self.result_label.setText(f"Всего записей: {len(applicants)}")
+        self.result_label.setText(f"Всего записей: {self.applicants_model.rowCount()}")
         self.time_label.setText(f"Время обновления: {elapsed_time:.3f} сек")
         
-        if elapsed_time > 3:
+        if elapsed_time > self.SLOW_QUERY_MS / 1000:
             self.time_label.setStyleSheet("color: red;")
         else:
             self.time_label.setStyleSheet("color: green;")
     
+    def on_filter_error(self, generation, message):
+        """Ошибка фильтрации"""
+        if generation != self.filter_generation:
+            return
+        self.slow_query_timer.stop()
+        self.time_label.setText("Ошибка запроса")
+        self.time_label.setStyleSheet("color: red;")
+        QMessageBox.critical(self, "Ошибка", f"Ошибка фильтрации: {message}")
+    
+    def on_filter_slow(self):
+        """Запрос выполняется дольше порога - предупреждаем, не дожидаясь результата"""
+        self.time_label.setText(f"Запрос выполняется дольше {self.SLOW_QUERY_MS // 1000} сек...")
+        self.time_label.setStyleSheet("color: red;")
+    
     def reset_filters(self):
         """Сброс всех фильтров"""
         self.program_combo.setCurrentText("Все программы")
@@ -1875,17 +4265,20 @@ class MainWindow(QMainWindow):
             return
         
         filters = [FilterCondition("list_date", "=", date, LogicOperator.AND)]
-        applicants = self.db.get_applicants_with_filters(filters)
         
-        if not applicants:
-            self.dist_canvas.draw()
-            return
+        # Гистограмма баллов по программам считается в SQL; для boxplot
+        # значения разворачиваются обратно по количеству
+        histogram = {}
+        for row in self.db.aggregate_applicants(filters, group_by=('program', 'total_score')):
+            scores, counts = histogram.setdefault(row['program'], ([], []))
+            scores.append(row['total_score'])
+            counts.append(row['count'])
         
         scores_by_program = {}
         for program in self.programs:
-            program_scores = [a['total_score'] for a in applicants if a['program'] == program]
-            if program_scores:
-                scores_by_program[program] = program_scores
+            if program in histogram:
+                scores, counts = histogram[program]
+                scores_by_program[program] = np.repeat(scores, counts)
         
         if not scores_by_program:
             self.dist_canvas.draw()
@@ -2017,24 +4410,206 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Ошибка", f"Папка '{data_dir}' не найдена")
             return
         
-        loaded_files = 0
-        for filename in os.listdir(data_dir):
-            if filename.startswith(f"{date}_") and filename.endswith('.csv'):
-                filepath = os.path.join(data_dir, filename)
-                success = self.db.load_csv(filepath, date)
-                if success:
-                    loaded_files += 1
-                    print(f"Загружен: {filename}")
-                else:
-                    print(f"Ошибка загрузки: {filename}")
+        filepaths = self.date_filepaths(data_dir, date)
+        if not filepaths:
+            QMessageBox.warning(
+                self, "Предупреждение",
+                f"Не найдено CSV файлов для даты {date} в папке 'data/'"
+            )
+            return
         
-        if loaded_files > 0:
-            self.load_data()
-            QMessageBox.information(self, "Успех", f"Загружено {loaded_files} файлов за {date}!")
+        self.start_date_ingest(date, filepaths)
+    
+    @staticmethod
+    def date_filepaths(data_dir, date):
+        """Файлы конкурсных списков ДД.ММ_Программа.csv за дату"""
+        return [
+            os.path.join(data_dir, filename) for filename in sorted(os.listdir(data_dir))
+            if filename.startswith(f"{date}_") and filename.endswith('.csv')
+        ]
+    
+    def background_busy(self):
+        """Выполняется ли фоновая загрузка или расчет проходных баллов"""
+        for thread_name in ('ingest_thread', 'watch_thread', 'calculation_thread'):
+            thread = getattr(self, thread_name, None)
+            if thread is not None and thread.isRunning():
+                return True
+        return False
+    
+    def ingest_running(self):
+        """Предупреждение, если фоновая загрузка данных еще не завершена"""
+        if self.background_busy():
+            QMessageBox.warning(self, "Предупреждение", "Загрузка данных уже выполняется")
+            return True
+        return False
+    
+    def toggle_watch(self, enabled):
+        """Включение и выключение наблюдения за папкой данных"""
+        if enabled:
+            # Первый опрос ставит в очередь все файлы папки: неизмененные
+            # пропускаются по манифесту загрузок
+            self.watch_state = {}
+            self.scan_watch_dir()
+            self.watch_poll_timer.start()
+            print(f"Наблюдение за папкой '{self.WATCH_DIR}' включено")
+        else:
+            self.watch_poll_timer.stop()
+            self.watch_coalesce_timer.stop()
+            self.watch_pending.clear()
+            print(f"Наблюдение за папкой '{self.WATCH_DIR}' выключено")
+    
+    def scan_watch_dir(self):
+        """Опрос папки данных: новые и измененные списки ставятся в очередь загрузки"""
+        if not os.path.isdir(self.WATCH_DIR):
+            return
+        
+        state = {}
+        for entry in os.scandir(self.WATCH_DIR):
+            parts = entry.name.split('_')
+            if not entry.is_file() or len(parts) < 2 or not entry.name.endswith('.csv'):
+                continue
+            try:
+                ListDate.to_key(parts[0])
+            except ValueError:
+                continue
+            stat = entry.stat()
+            state[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            if self.watch_state.get(entry.path) != state[entry.path]:
+                self.watch_pending.add(entry.path)
+                # Каждое изменение откладывает загрузку: дописываемый файл
+                # и пачка новых файлов загружаются после затишья одним проходом
+                self.watch_coalesce_timer.start()
+        self.watch_state = state
+    
+    def ingest_watched_files(self):
+        """Загрузка накопленных изменений папки данных в фоновом потоке"""
+        if not self.watch_pending:
+            return
+        if self.background_busy():
+            # Загрузка или расчет еще идут - откладываем до следующего затишья
+            self.watch_coalesce_timer.start()
+            return
+        
+        files_by_date = {}
+        for filepath in sorted(self.watch_pending):
+            date = os.path.basename(filepath).split('_')[0]
+            files_by_date.setdefault(date, []).append(filepath)
+        self.watch_pending.clear()
+        
+        mode = "cross_program" if self.cross_program_action.isChecked() else "independent"
+        self.watch_thread = WatchIngestThread(self.db, files_by_date, list(self.programs.keys()), mode)
+        self.watch_thread.finished.connect(self.on_watch_ingest_finished)
+        self.watch_thread.error.connect(lambda e: print(f"Ошибка автозагрузки: {e}"))
+        self.watch_thread.start()
+    
+    def on_watch_ingest_finished(self, results, changed_dates):
+        """Обработчик автозагрузки: одно обновление интерфейса на пачку файлов"""
+        for result in results:
+            filename = os.path.basename(result.filepath)
+            if result.skipped:
+                continue
+            if result.success:
+                print(f"Автозагрузка: {filename} (изменения: "
+                      f"+{result.inserted} ~{result.updated} -{result.deleted})")
+            else:
+                print(f"Ошибка автозагрузки: {filename} ({result.error})")
+        
+        if changed_dates:
+            self.refresh_views()
+        if self.watch_pending:
+            self.watch_coalesce_timer.start()
+    
+    def refresh_views(self):
+        """Обновление открытых представлений без сброса выбранной даты"""
+        current_date = self.date_combo.currentText()
+        dates = self.db.get_dates()
+        
+        self.date_combo.blockSignals(True)
+        self.date_combo.clear()
+        self.date_combo.addItems(dates)
+        if current_date in dates:
+            self.date_combo.setCurrentText(current_date)
+        elif dates:
+            self.date_combo.setCurrentText(dates[-1])
+        self.date_combo.blockSignals(False)
+        
+        self.schedule_filters()
+        self.update_pass_scores()
+        self.update_graphs()
+    
+    def start_date_ingest(self, date, filepaths):
+        """Фоновая загрузка файлов за дату с диалогом прогресса и отменой"""
+        if self.ingest_running():
+            return
+        
+        # Создаем диалог прогресса
+        progress_dialog = QDialog(self)
+        progress_dialog.setWindowTitle("Загрузка данных")
+        progress_dialog.setGeometry(400, 400, 300, 120)
+        
+        progress_layout = QVBoxLayout(progress_dialog)
+        
+        progress_label = QLabel(f"Загружаются списки за {date} ({len(filepaths)} файлов)...")
+        progress_layout.addWidget(progress_label)
+        
+        progress_bar = QProgressBar()
+        progress_bar.setRange(0, 100)
+        progress_layout.addWidget(progress_bar)
+        
+        cancel_button = QPushButton("Отмена")
+        progress_layout.addWidget(cancel_button)
+        
+        progress_dialog.show()
+        
+        # Создаем и запускаем поток загрузки
+        self.ingest_thread = DateIngestThread(
+            self.db, filepaths, date, force=self.force_reload_action.isChecked()
+        )
+        cancel_button.clicked.connect(self.ingest_thread.cancel)
+        cancel_button.clicked.connect(lambda: progress_label.setText("Отмена загрузки..."))
+        self.ingest_thread.progress.connect(progress_bar.setValue)
+        self.ingest_thread.finished.connect(lambda results: progress_dialog.close())
+        self.ingest_thread.finished.connect(lambda results: self.on_date_ingest_finished(date, results))
+        self.ingest_thread.error.connect(lambda e: progress_dialog.close())
+        self.ingest_thread.error.connect(lambda e: QMessageBox.critical(self, "Ошибка", f"Ошибка загрузки: {e}"))
+        
+        self.ingest_thread.start()
+    
+    def on_date_ingest_finished(self, date, results):
+        """Обработчик завершения загрузки файлов за дату"""
+        loaded_files = 0
+        skipped_files = 0
+        rejected_rows = 0
+        for result in results:
+            filename = os.path.basename(result.filepath)
+            if result.skipped:
+                skipped_files += 1
+                print(f"Без изменений: {filename}")
+            elif result.success:
+                loaded_files += 1
+                rejected_rows += len(result.rejected)
+                print(f"Загружен: {filename} ({result.loaded} записей, отклонено {len(result.rejected)}; "
+                      f"изменения: +{result.inserted} ~{result.updated} -{result.deleted})")
+                if result.rejected:
+                    print("  качество: " + ", ".join(f"{rule} {count}" for rule, count in result.quality.items()))
+                for rejected in result.rejected:
+                    print(f"  строка {rejected.row}, ID {rejected.external_id}: {rejected.reason}")
+            else:
+                print(f"Ошибка загрузки: {filename} ({result.error})")
+        
+        if loaded_files or skipped_files:
+            if loaded_files:
+                self.load_data()
+            message = f"Загружено {loaded_files} файлов за {date}!"
+            if skipped_files:
+                message += f"\nНе изменились с прошлой загрузки: {skipped_files}"
+            if rejected_rows:
+                message += f"\nОтклонено строк: {rejected_rows} (подробности в консоли)"
+            QMessageBox.information(self, "Успех", message)
         else:
             QMessageBox.warning(
                 self, "Предупреждение",
-                f"Не найдено CSV файлов для даты {date} в папке 'data/'"
+                f"Данные за {date} не загружены: {results[0].error}"
             )
     
     def load_csv_dialog(self):
@@ -2053,15 +4628,82 @@ class MainWindow(QMainWindow):
             if len(parts) >= 2:
                 date = parts[0]
                 
-                success = self.db.load_csv(filepath, date)
-                if success:
-                    print(f"Загружен: {filename}")
+                result = self.db.load_csv_bulk(
+                    filepath, date, mode="diff", force=self.force_reload_action.isChecked()
+                )
+                if result.skipped:
+                    print(f"Без изменений: {filename}")
+                elif result.success:
+                    print(f"Загружен: {filename} ({result.loaded} записей, отклонено {len(result.rejected)}; "
+                          f"изменения: +{result.inserted} ~{result.updated} -{result.deleted})")
+                    for rejected in result.rejected:
+                        print(f"  строка {rejected.row}, ID {rejected.external_id}: {rejected.reason}")
                 else:
                     print(f"Ошибка загрузки: {filename}")
         
         self.load_data()
         QMessageBox.information(self, "Успех", "Данные успешно загружены!")
     
+    def load_csv_stream_dialog(self):
+        """Потоковая загрузка большого CSV файла в фоновом потоке"""
+        filepath, _ = QFileDialog.getOpenFileName(
+            self, "Выберите CSV файл",
+            "", "CSV files (*.csv);;All files (*.*)"
+        )
+        
+        if not filepath or self.ingest_running():
+            return
+        
+        filename = os.path.basename(filepath)
+        parts = filename.split('_')
+        if len(parts) < 2:
+            QMessageBox.critical(self, "Ошибка", "Имя файла должно иметь вид ДД.ММ_Программа.csv")
+            return
+        
+        # Создаем диалог прогресса
+        progress_dialog = QDialog(self)
+        progress_dialog.setWindowTitle("Загрузка CSV")
+        progress_dialog.setGeometry(400, 400, 300, 100)
+        
+        progress_layout = QVBoxLayout(progress_dialog)
+        
+        progress_label = QLabel(f"Загружается {filename}...")
+        progress_layout.addWidget(progress_label)
+        
+        progress_dialog.show()
+        
+        # Создаем и запускаем поток загрузки
+        self.ingest_thread = IngestThread(
+            self.db, filepath, parts[0], force=self.force_reload_action.isChecked()
+        )
+        self.ingest_thread.progress.connect(
+            lambda rows, rate: progress_label.setText(f"Прочитано строк: {rows:,} ({rate:,.0f} строк/с)")
+        )
+        self.ingest_thread.finished.connect(lambda result: progress_dialog.close())
+        self.ingest_thread.finished.connect(self.on_stream_ingest_finished)
+        self.ingest_thread.error.connect(lambda e: progress_dialog.close())
+        self.ingest_thread.error.connect(lambda e: QMessageBox.critical(self, "Ошибка", f"Ошибка загрузки: {e}"))
+        
+        self.ingest_thread.start()
+    
+    def on_stream_ingest_finished(self, result):
+        """Обработчик завершения потоковой загрузки"""
+        if result.skipped:
+            QMessageBox.information(
+                self, "Без изменений",
+                f"Файл {os.path.basename(result.filepath)} не изменился с прошлой загрузки"
+            )
+            return
+        print(f"Загружен: {os.path.basename(result.filepath)} ({result.loaded} записей, "
+              f"отклонено {len(result.rejected)})")
+        for rejected in result.rejected:
+            print(f"  строка {rejected.row}, ID {rejected.external_id}: {rejected.reason}")
+        self.load_data()
+        QMessageBox.information(
+            self, "Успех",
+            f"Загружено записей: {result.loaded}\nОтклонено строк: {len(result.rejected)}"
+        )
+    
     def clear_database(self):
         """Очистка базы данных"""
         reply = QMessageBox.question(
@@ -2107,7 +4749,8 @@ class MainWindow(QMainWindow):
         progress_dialog.show()
         
         # Создаем и запускаем поток расчета
-        self.calculation_thread = CalculationThread(self.db, dates, list(self.programs.keys()))
+        mode = "cross_program" if self.cross_program_action.isChecked() else "independent"
+        self.calculation_thread = CalculationThread(self.db, dates, list(self.programs.keys()), mode)
         self.calculation_thread.progress.connect(progress_bar.setValue)
         self.calculation_thread.finished.connect(lambda: progress_dialog.close())
         self.calculation_thread.finished.connect(self.on_calculation_finished)
@@ -2183,12 +4826,33 @@ class MainWindow(QMainWindow):
         else:
             stats_text += f"Даты в базе: {', '.join(dates)}\n\n"
             
+            counts = self.db.get_count_matrix()
             for date in dates:
                 stats_text += f"Дата: {date}\n"
                 for program in self.programs:
-                    count = self.db.get_applicants_count(program, date)
+                    count = counts.count(program, date)
                     stats_text += f"  {program}: {count} абитуриентов\n"
                 stats_text += "\n"
+            
+            manifest = self.db.get_ingest_manifest()
+            if manifest:
+                stats_text += "ЗАГРУЖЕННЫЕ ФАЙЛЫ\n"
+                stats_text += "-" * 50 + "\n"
+                for entry in manifest:
+                    modified = datetime.fromtimestamp(entry['mtime']).strftime('%d.%m.%Y %H:%M:%S')
+                    stats_text += (
+                        f"{entry['list_date']} {entry['program']}: {entry['path']}\n"
+                        f"  изменен {modified}, {entry['size']} байт, хэш {entry['content_hash'][:12]}, "
+                        f"строк {entry['row_count']} (отклонено {entry['rejected_count']}), "
+                        f"загружен {entry['loaded_at']}\n"
+                    )
+            
+            quality = self.db.get_quality_report()
+            if quality:
+                stats_text += "\nКАРАНТИН (ОТКЛОНЕННЫЕ СТРОКИ)\n"
+                stats_text += "-" * 50 + "\n"
+                for entry in quality:
+                    stats_text += f"{entry['list_date']} {entry['program']}: {entry['rule']} - {entry['rows']} строк\n"
         
         text_edit.setText(stats_text)
         layout.addWidget(text_edit)
@@ -2199,9 +4863,36 @@ class MainWindow(QMainWindow):
         
         dialog.exec()
     
+    def run_index_maintenance(self):
+        """Обновление статистики индексов базы данных"""
+        import time
+        start_time = time.time()
+        self.db.analyze()
+        elapsed_time = time.time() - start_time
+        QMessageBox.information(
+            self, "Обслуживание индексов",
+            f"Статистика индексов обновлена за {elapsed_time:.3f} сек"
+        )
+    
+    def run_summary_check(self):
+        """Проверка и пересборка сводной таблицы по абитуриентам"""
+        import time
+        start_time = time.time()
+        mismatches = self.db.rebuild_summary()
+        elapsed_time = time.time() - start_time
+        if mismatches:
+            result = f"Найдено и исправлено расхождений: {mismatches}"
+        else:
+            result = "Расхождений не найдено"
+        QMessageBox.information(
+            self, "Проверка сводной таблицы",
+            f"{result}\nСводная таблица пересобрана за {elapsed_time:.3f} сек"
+        )
+    
     def run_test_1(self):
         """Испытание №1 - Проверка корректности сформированных конкурсных списков"""
-        dates = self.db.get_dates()
+        counts = self.db.get_count_matrix()
+        dates = list(counts.dates)
         
         report = []
         report.append("=" * 60)
@@ -2230,7 +4921,7 @@ class MainWindow(QMainWindow):
                 # Проверка программ для каждого дня
                 for day in dates:
                     for program in self.programs:
-                        count = self.db.get_applicants_count(program, day)
+                        count = counts.count(program, day)
                         if count > 0:
                             report.append(f"  • {day} {program}: {count} записей ✓")
                         else:
@@ -2239,7 +4930,7 @@ class MainWindow(QMainWindow):
             report.append("")
             report.append("b. Общее количество абитуриентов:")
             for day in dates:
-                total = self.db.get_applicants_count(date=day)
+                total = counts.count(date=day)
                 report.append(f"  {day}: {total} абитуриентов")
             
             report.append("")
@@ -2249,11 +4940,10 @@ class MainWindow(QMainWindow):
             report.append("")
             report.append("d. Различия конкурсных списков разных дней:")
             for program in self.programs:
-                counts = []
+                day_counts = []
                 for day in dates:
-                    count = self.db.get_applicants_count(program, day)
-                    counts.append(f"{day}: {count}")
-                report.append(f"  {program}: {' → '.join(counts)}")
+                    day_counts.append(f"{day}: {counts.count(program, day)}")
+                report.append(f"  {program}: {' → '.join(day_counts)}")
             
             report.append("")
             report.append("e. Структура БД:")
@@ -2314,7 +5004,7 @@ class MainWindow(QMainWindow):
                     FilterCondition("list_date", "=", '01.08', LogicOperator.AND),
                     FilterCondition("consent", "=", 1, LogicOperator.AND)
                 ]
-                consents = len(self.db.get_applicants_with_filters(filters))
+                consents = self.db.count_applicants(filters)
                 places = self.places[program]
                 if consents < places:
                     report.append(f"    {program}: {consents} < {places} ✓ (согласий меньше мест)")
@@ -2492,10 +5182,11 @@ class MainWindow(QMainWindow):
                 f.write(f"Дата формирования: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}\n\n")
                 
                 f.write("Данные в базе:\n")
+                counts = self.db.get_count_matrix()
                 for date in dates:
                     f.write(f"\nДата: {date}\n")
                     for program in self.programs:
-                        count = self.db.get_applicants_count(program, date)
+                        count = counts.count(program, date)
                         f.write(f"  {program}: {count} абитуриентов\n")
                 
                 f.write("\n" + "=" * 70 + "\n")
@@ -2637,7 +5328,7 @@ class DemoDialog(QDialog):
             "2. Алгоритм загрузки:\n"
             "   a) Проверка существования таблиц\n"
             "   b) Очистка старых данных за ту же дату и программу\n"
-            "   c) Построчная вставка данных из CSV\n"
+            "   c) Пакетная вставка данных из CSV одной транзакцией\n"
             "   d) Фиксация транзакции\n\n"
             "3. Проверка загрузки:\n"
             "   - Используйте меню 'Данные → Показать статистику БД'\n"
@@ -2748,18 +5439,19 @@ class DemoDialog(QDialog):
             text += "-" * 40 + "\n"
             
             # Получаем всех абитуриентов за эту дату
-            conn = sqlite3.connect(self.db.db_path)
+            conn = self.db.get_connection()
             cursor = conn.cursor()
             
             # Получаем всех абитуриентов с их программами
             cursor.execute('''
-                SELECT external_id, GROUP_CONCAT(program) as programs
-                FROM applicants 
-                WHERE list_date = ?
-                GROUP BY external_id
-                HAVING COUNT(DISTINCT program) > 1
-                ORDER BY external_id
-            ''', (date,))
+                SELECT a.external_id, GROUP_CONCAT(p.name) as programs
+                FROM applicants a
+                JOIN programs p ON p.id = a.program
+                WHERE a.list_date = ?
+                GROUP BY a.external_id
+                HAVING COUNT(DISTINCT a.program) > 1
+                ORDER BY a.external_id
+            ''', (ListDate.to_key(date),))
             
             multi_program_students = cursor.fetchall()
             
@@ -2800,14 +5492,13 @@ class DemoDialog(QDialog):
                 for (prog1, prog2, prog3, prog4), count in intersections_4.items():
                     text += f"  {prog1} & {prog2} & {prog3} & {prog4}: {count} абитуриентов\n"
             
-            conn.close()
             text += "\n" + "=" * 60 + "\n\n"
         
         self.intersection_text.setPlainText(text)
     
     def show_database_structure(self):
         """Показать структуру базы данных"""
-        conn = sqlite3.connect(self.db.db_path)
+        conn = self.db.get_connection()
         cursor = conn.cursor()
         
         # Получаем информацию о таблицах
@@ -2840,7 +5531,6 @@ class DemoDialog(QDialog):
                     description.strip() or "-"
                 ])
         
-        conn.close()
         
         # Заполняем таблицу
         self.structure_table.setRowCount(len(structure_data))
@@ -2892,11 +5582,18 @@ id,consent,priority,physics_score,russian_score,math_score,achievements_score,to
         sql_info = """SQL ОПЕРАЦИИ В БАЗЕ ДАННЫХ
 
 1. СОЗДАНИЕ ТАБЛИЦ:
+-- Словарь программ: в остальных таблицах program - код из programs.id
+CREATE TABLE programs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+)
+
+-- list_date - номер дня от 1 января года кампании (01.08 -> 212)
 CREATE TABLE applicants (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     external_id INTEGER NOT NULL,
-    program TEXT NOT NULL,
-    list_date TEXT NOT NULL,
+    program INTEGER NOT NULL,
+    list_date INTEGER NOT NULL,
     consent BOOLEAN NOT NULL,
     priority INTEGER NOT NULL CHECK (priority BETWEEN 1 AND 4),
     physics_score INTEGER NOT NULL,
@@ -2930,24 +5627,26 @@ SET consent = ?
 WHERE external_id = ? AND program = ? AND list_date = ?
 
 5. ВЫБОРКА ДАННЫХ С ФИЛЬТРАЦИЕЙ:
-SELECT * FROM applicants 
-WHERE program = 'ПМ' 
-  AND list_date = '01.08' 
-  AND consent = 1 
-  AND total_score >= 200
-ORDER BY total_score DESC
+SELECT a.* FROM applicants a
+JOIN programs p ON p.id = a.program
+WHERE p.name = 'ПМ'
+  AND a.list_date = 212  -- 01.08
+  AND a.consent = 1
+  AND a.total_score >= 200
+ORDER BY a.total_score DESC, a.external_id
 
 6. АГРЕГАЦИЯ:
--- Количество абитуриентов по программам
-SELECT program, COUNT(*) 
-FROM applicants 
-WHERE list_date = '01.08' 
-GROUP BY program
+-- Количество абитуриентов по программам (из сводки applicants_summary)
+SELECT p.name, SUM(s.applications)
+FROM applicants_summary s
+JOIN programs p ON p.id = s.program
+WHERE s.list_date = 212  -- 01.08
+GROUP BY p.name
 
 -- Средний балл по приоритетам
-SELECT priority, AVG(total_score) 
-FROM applicants 
-WHERE program = 'ПМ' 
+SELECT priority, AVG(total_score)
+FROM applicants
+WHERE program = (SELECT id FROM programs WHERE name = 'ПМ')
 GROUP BY priority"""
         
         dialog = QDialog(self)
@@ -3021,64 +5720,117 @@ class ExtendedMainWindow(MainWindow):
         structure_info = """СТРУКТУРА БАЗЫ ДАННЫХ
 ================================
 
+Во всех таблицах program - INTEGER код из словаря programs, list_date -
+INTEGER номер дня от 1 января года кампании (01.08 -> 212). Названия
+программ и даты ДД.ММ подставляются при выдаче результатов.
+
 ТАБЛИЦЫ:
 --------
-1. applicants (абитуриенты)
+1. programs (словарь программ)
+   • id - код программы, name - название (UNIQUE)
+
+2. applicants (абитуриенты)
    • Основная таблица с данными абитуриентов
-   • Содержит 11 полей
+   • Содержит 12 полей
    • UNIQUE constraint по external_id, program, list_date
 
-2. pass_scores (проходные баллы)
+3. pass_scores (проходные баллы)
    • Хранит рассчитанные проходные баллы
-   • Связь с applicants через program и list_date
+   • source_fingerprint - версия данных, по которой выполнен расчет
    • UNIQUE constraint по program, list_date
 
-3. statistics (статистика)
-   • Хранит статистическую информацию
-   • Связь с applicants через program и list_date
+4. statistics (статистика)
+   • Заявления и зачисленные по приоритетам
    • UNIQUE constraint по program, list_date
 
+5. list_versions (версии списков)
+   • Счетчик изменений списка (program, list_date)
+   • Пересчет проходных баллов только для изменившихся списков
+
+6. applicants_summary и applicants_score_histogram (сводка)
+   • Количество и баллы по (list_date, program, consent, priority)
+   • Гистограмма баллов по тем же разрезам
+   • Обновляются вместе с applicants при загрузке и удалении
+
+7. ingest_manifest (манифест загрузок)
+   • Файл, размер, хэш содержимого и число строк загруженного списка
+   • Файл с тем же хэшем повторно не загружается
+
+8. quarantine (карантин)
+   • Строки CSV, не прошедшие проверку: правило, причина, исходный текст
+
 СВЯЗИ МЕЖДУ ТАБЛИЦАМИ:
 ---------------------
-applicants 1:n pass_scores
-  • program, list_date → program, list_date
-  
-applicants 1:n statistics
+programs 1:n applicants, pass_scores, statistics, list_versions,
+             applicants_summary, ingest_manifest, quarantine
+  • program → programs.id
+
+applicants n:1 pass_scores, statistics, list_versions, ingest_manifest
   • program, list_date → program, list_date
 
 СХЕМА БАЗЫ ДАННЫХ:
 -----------------
++-----------------+     +-----------------+
+|    programs     |     |   applicants    |
++-----------------+     +-----------------+
+| id              |-----| program         |
+| name            |     | id              |
++-----------------+     | external_id     |
+                        | list_date       |
+                        | consent         |
+                        | priority        |
+                        | physics_score   |
+                        | russian_score   |
+                        | math_score      |
+                        | achievements    |
+                        | total_score     |
+                        | created_at      |
+                        +-----------------+
+                                 |
+                                 | program, list_date
+                                 |
++-----------------+     +-----------------+     +-----------------+
+|   pass_scores   |     |  list_versions  |     |   statistics    |
++-----------------+     +-----------------+     +-----------------+
+| id              |     | program         |     | id              |
+| program         |     | list_date       |     | program         |
+| list_date       |     | version         |     | list_date       |
+| pass_score      |     +-----------------+     | total_apps      |
+| calculation_time|                             | priority_1_apps |
+| source_fingerpr.|                             | ...             |
++-----------------+                             | priority_4_admit|
+                                                +-----------------+
 +-----------------+     +-----------------+     +-----------------+
-|   applicants    |     |   pass_scores   |     |   statistics    |
+|applicants_summ. |     | ingest_manifest |     |   quarantine    |
 +-----------------+     +-----------------+     +-----------------+
-| id              |     | id              |     | id              |
-| external_id     |     | program         |     | program         |
-| program         |-----| list_date       |-----| list_date       |
-| list_date       |     | pass_score      |     | total_apps      |
-| consent         |     | calculation_time|     | priority_1_apps |
-| priority        |     +-----------------+     | ...             |
-| physics_score   |                             | priority_4_admit|
-| russian_score   |                             +-----------------+
-| math_score      |
-| achievements    |
-| total_score     |
-| created_at      |
-+-----------------+
+| list_date       |     | program         |     | id              |
+| program         |     | list_date       |     | program         |
+| consent         |     | path            |     | list_date       |
+| priority        |     | size, mtime     |     | path, row       |
+| applications    |     | content_hash    |     | external_id     |
+| score_sum       |     | row_count       |     | rule, reason    |
+| score_min/max   |     | rejected_count  |     | raw             |
++-----------------+     | loaded_at       |     | quarantined_at  |
+                        +-----------------+     +-----------------+
 
 ОГРАНИЧЕНИЯ (CONSTRAINTS):
 -------------------------
 1. UNIQUE (external_id, program, list_date) - уникальность записи
 2. CHECK (priority BETWEEN 1 AND 4) - диапазон приоритета
-3. FOREIGN KEY (логическая) program, list_date → pass_scores
-4. FOREIGN KEY (логическая) program, list_date → statistics
+3. UNIQUE programs.name - одно название на код программы
+4. FOREIGN KEY (логическая) program → programs.id во всех таблицах
+5. FOREIGN KEY (логическая) program, list_date → pass_scores, statistics,
+   list_versions, ingest_manifest
 
 ИНДЕКСЫ:
 --------
-• Автоматически создаются для PRIMARY KEY
-• Рекомендуемые индексы для ускорения запросов:
-  - CREATE INDEX idx_applicants_program_date ON applicants(program, list_date)
-  - CREATE INDEX idx_applicants_consent ON applicants(consent)
-  - CREATE INDEX idx_applicants_total_score ON applicants(total_score)"""
+• Автоматически создаются для PRIMARY KEY и UNIQUE
+• Составные индексы (создаются миграцией схемы):
+  - idx_applicants_rank ON applicants(list_date, program, consent, priority, total_score)
+  - idx_applicants_date_score ON applicants(list_date, total_score DESC, external_id)
+  - idx_applicants_score ON applicants(total_score DESC, external_id)
+  - idx_quarantine_list ON quarantine(program, list_date)
+• После крупных загрузок выполняется ANALYZE"""
         
         text_edit.setPlainText(structure_info)
         layout.addWidget(text_edit)
@@ -3132,12 +5884,13 @@ applicants 1:n statistics
    a) Чтение CSV с помощью pandas.read_csv()
    b) Определение программы из имени файла
    c) Удаление старых данных за эту дату и программу
-   d) Построчная вставка данных
+   d) Пакетная вставка данных (executemany)
    e) Фиксация транзакции
 
 2. SQL операции загрузки:
    BEGIN TRANSACTION;
-   DELETE FROM applicants WHERE program='ПМ' AND list_date='01.08';
+   -- program = 1 (ПМ в словаре programs), list_date = 212 (01.08)
+   DELETE FROM applicants WHERE program = 1 AND list_date = 212;
    INSERT INTO applicants (...) VALUES (...);
    ... (повтор для каждой строки)
    COMMIT;
@@ -3195,21 +5948,14 @@ applicants 1:n statistics
             QMessageBox.critical(self, "Ошибка", f"Папка '{data_dir}' не найдена")
             return
         
-        loaded_files = 0
-        for filename in os.listdir(data_dir):
-            if filename.startswith(f"{date}_") and filename.endswith('.csv'):
-                filepath = os.path.join(data_dir, filename)
-                success = self.db.load_csv(filepath, date)
-                if success:
-                    loaded_files += 1
-        
-        if loaded_files > 0:
-            self.load_data()
-            QMessageBox.information(self, "Успех", f"Загружено {loaded_files} файлов за {date}!")
-        else:
-            QMessageBox.warning(self, "Предупреждение", 
+        filepaths = self.date_filepaths(data_dir, date)
+        if not filepaths:
+            QMessageBox.warning(self, "Предупреждение",
                                f"Не найдено CSV файлов для даты {date}.\n"
                                f"Сначала сгенерируйте данные через меню 'Файл'.")
+            return
+        
+        self.start_date_ingest(date, filepaths)
     
     def demo_list_updates(self):
         """Демонстрация обновления списков (CRUD операции)"""
@@ -3276,27 +6022,33 @@ DELETE (УДАЛЕНИЕ):
 
 ПРИМЕРЫ SQL ЗАПРОСОВ:
 --------------------
+-- program - код из словаря programs, list_date - номер дня (01.08 -> 212)
+
 -- CREATE
-INSERT INTO applicants (external_id, program, list_date, consent, priority, physics_score, total_score)
-VALUES (100500, 'ПМ', '01.08', 1, 1, 85, 270);
+INSERT INTO applicants (external_id, program, list_date, consent, priority,
+                        physics_score, russian_score, math_score,
+                        achievements_score, total_score)
+VALUES (100500, (SELECT id FROM programs WHERE name = 'ПМ'), 212,
+        1, 1, 85, 90, 90, 5, 270);
 
 -- READ
-SELECT * FROM applicants 
-WHERE program = 'ПМ' 
-  AND list_date = '01.08'
-  AND total_score > 250
-ORDER BY total_score DESC;
+SELECT a.* FROM applicants a
+JOIN programs p ON p.id = a.program
+WHERE p.name = 'ПМ'
+  AND a.list_date = 212
+  AND a.total_score > 250
+ORDER BY a.total_score DESC;
 
 -- UPDATE
-UPDATE applicants 
-SET consent = 0 
-WHERE external_id = 100500 
-  AND program = 'ПМ' 
-  AND list_date = '01.08';
+UPDATE applicants
+SET consent = 0
+WHERE external_id = 100500
+  AND program = (SELECT id FROM programs WHERE name = 'ПМ')
+  AND list_date = 212;
 
 -- DELETE
-DELETE FROM applicants 
-WHERE list_date = '01.08' 
+DELETE FROM applicants
+WHERE list_date = 212
   AND consent = 0;""")
         
         crud_layout.addWidget(crud_text)
@@ -3330,7 +6082,7 @@ WHERE list_date = '01.08'
             demo_info += "   • Вставка обновленных данных\n\n"
             
             demo_info += "3. Удаление 03.08 (очистка устаревших)\n"
-            demo_info += "   • DELETE FROM applicants WHERE list_date = '03.08'\n"
+            demo_info += f"   • DELETE FROM applicants WHERE list_date = {ListDate.to_key('03.08')}  -- 03.08\n"
             demo_info += "   • Каскадное удаление в pass_scores, statistics\n"
         else:
             demo_info += "База данных пуста. Загрузите данные для демонстрации."
@@ -3365,24 +6117,25 @@ WHERE list_date = '01.08'
     
     def compare_dates(self, date1, date2):
         """Сравнение данных за две даты"""
-        conn = sqlite3.connect(self.db.db_path)
+        conn = self.db.get_connection()
         cursor = conn.cursor()
         
+        key1, key2 = ListDate.to_key(date1), ListDate.to_key(date2)
+        
         # Сравниваем количество записей
-        cursor.execute("SELECT COUNT(*) FROM applicants WHERE list_date = ?", (date1,))
+        cursor.execute("SELECT COUNT(*) FROM applicants WHERE list_date = ?", (key1,))
         count1 = cursor.fetchone()[0]
         
-        cursor.execute("SELECT COUNT(*) FROM applicants WHERE list_date = ?", (date2,))
+        cursor.execute("SELECT COUNT(*) FROM applicants WHERE list_date = ?", (key2,))
         count2 = cursor.fetchone()[0]
         
         # Сравниваем средние баллы
-        cursor.execute("SELECT AVG(total_score) FROM applicants WHERE list_date = ?", (date1,))
+        cursor.execute("SELECT AVG(total_score) FROM applicants WHERE list_date = ?", (key1,))
         avg1 = cursor.fetchone()[0] or 0
         
-        cursor.execute("SELECT AVG(total_score) FROM applicants WHERE list_date = ?", (date2,))
+        cursor.execute("SELECT AVG(total_score) FROM applicants WHERE list_date = ?", (key2,))
         avg2 = cursor.fetchone()[0] or 0
         
-        conn.close()
         
         comparison = f"СРАВНЕНИЕ ДАННЫХ\n"
         comparison += "=" * 40 + "\n"
@@ -3410,7 +6163,7 @@ WHERE list_date = '01.08'
 UPDATE applicants 
 SET consent = 1 
 WHERE total_score > 250 
-  AND list_date = '02.08';
+  AND list_date = 213;  -- 02.08
 
 2. КОРРЕКЦИЯ БАЛЛОВ:
 -------------------
@@ -3419,8 +6172,8 @@ UPDATE applicants
 SET physics_score = physics_score + 5,
     total_score = total_score + 5
 WHERE priority = 1 
-  AND program = 'ПМ'
-  AND list_date = '03.08';
+  AND program = (SELECT id FROM programs WHERE name = 'ПМ')
+  AND list_date = 214;  -- 03.08
 
 3. ИЗМЕНЕНИЕ ПРИОРИТЕТОВ:
 -------------------------
@@ -3438,7 +6191,7 @@ WHERE external_id = 100500;
 -- Пересчитать суммарный балл
 UPDATE applicants 
 SET total_score = physics_score + russian_score + math_score + achievements_score
-WHERE list_date = '04.08';
+WHERE list_date = 215;  -- 04.08
 
 5. УСЛОВНОЕ ОБНОВЛЕНИЕ:
 ----------------------
@@ -3450,8 +6203,8 @@ WHERE total_score >= (
     FROM (
         SELECT total_score 
         FROM applicants 
-        WHERE program = 'ПМ' 
-          AND list_date = '04.08' 
+        WHERE program = (SELECT id FROM programs WHERE name = 'ПМ')
+          AND list_date = 215  -- 04.08
           AND consent = 1
         ORDER BY total_score DESC 
         LIMIT 40
@@ -3477,123 +6230,98 @@ WHERE total_score >= (
 
 # РАСШИРЕННЫЙ КЛАСС БАЗЫ ДАННЫХ С МЕТОДАМИ УДАЛЕНИЯ
 class EnhancedDatabaseWithDelete(EnhancedDatabase):
-    def __init__(self, db_path="admission.db"):
-        super().__init__(db_path)
+    def __init__(self, db_path="admission.db", storage_profile="default"):
+        super().__init__(db_path, storage_profile)
     
     def delete_applicant_by_id(self, applicant_id: int) -> bool:
         """Удаление абитуриента по ID"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.get_connection()
             cursor = conn.cursor()
             
-            cursor.execute("DELETE FROM applicants WHERE id = ?", (applicant_id,))
-            
-            deleted_count = cursor.rowcount
+            deleted_count = self._delete_applicants(cursor, "id = ?", (applicant_id,))
             conn.commit()
-            conn.close()
+            self.data_generation += 1
             
             return deleted_count > 0
             
         except Exception as e:
+            self.get_connection().rollback()
             print(f"Ошибка при удалении абитуриента: {e}")
             return False
     
     def delete_applicant_by_external_id(self, external_id: int, program: str = None, date: str = None) -> bool:
         """Удаление абитуриента по внешнему ID (возможно с фильтрами)"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.get_connection()
             cursor = conn.cursor()
             
-            query = "DELETE FROM applicants WHERE external_id = ?"
+            where = "external_id = ?"
             params = [external_id]
             
             if program:
-                query += " AND program = ?"
-                params.append(program)
+                where += " AND program = ?"
+                params.append(self._program_key(program))
             
             if date:
-                query += " AND list_date = ?"
-                params.append(date)
-            
-            cursor.execute(query, params)
+                where += " AND list_date = ?"
+                params.append(ListDate.to_key(date))
             
-            deleted_count = cursor.rowcount
+            deleted_count = self._delete_applicants(cursor, where, params)
             conn.commit()
-            conn.close()
+            self.data_generation += 1
             
             return deleted_count > 0
             
         except Exception as e:
+            self.get_connection().rollback()
             print(f"Ошибка при удалении абитуриента: {e}")
             return False
     
     def delete_applicants_by_filters(self, filters: List[FilterCondition] = None) -> int:
         """Удаление абитуриентов по фильтрам"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.get_connection()
             cursor = conn.cursor()
             
-            query = "DELETE FROM applicants WHERE 1=1"
-            params = []
+            where, params = self._filter_clause(filters)
+            affected = self._affected_lists(cursor, where, params)
             
-            if filters:
-                for filter_cond in filters:
-                    sql_operator = filter_cond.logic.value
-                    
-                    if filter_cond.operator == "=":
-                        query += f" {sql_operator} {filter_cond.field} = ?"
-                        params.append(filter_cond.value)
-                    elif filter_cond.operator == ">":
-                        query += f" {sql_operator} {filter_cond.field} > ?"
-                        params.append(filter_cond.value)
-                    elif filter_cond.operator == "<":
-                        query += f" {sql_operator} {filter_cond.field} < ?"
-                        params.append(filter_cond.value)
-                    elif filter_cond.operator == ">=":
-                        query += f" {sql_operator} {filter_cond.field} >= ?"
-                        params.append(filter_cond.value)
-                    elif filter_cond.operator == "<=":
-                        query += f" {sql_operator} {filter_cond.field} <= ?"
-                        params.append(filter_cond.value)
-                    elif filter_cond.operator == "!=":
-                        query += f" {sql_operator} {filter_cond.field} != ?"
-                        params.append(filter_cond.value)
-                    elif filter_cond.operator == "IN":
-                        if isinstance(filter_cond.value, (list, tuple)):
-                            placeholders = ','.join(['?'] * len(filter_cond.value))
-                            query += f" {sql_operator} {filter_cond.field} IN ({placeholders})"
-                            params.extend(filter_cond.value)
-            
-            cursor.execute(query, params)
-            deleted_count = cursor.rowcount
-            
-            # Также удаляем связанные записи в других таблицах
-            # (логически связанные, не внешний ключ)
-            cursor.execute("DELETE FROM pass_scores WHERE pass_score IS NULL")
-            cursor.execute("DELETE FROM statistics WHERE total_applications = 0")
+            deleted_count = self._delete_applicants(cursor, where, params, affected)
+            
+            # Также удаляем связанные записи затронутых списков
+            # (логически связанные, не внешний ключ): статистика устарела,
+            # а отметки недобора будут пересчитаны. Остальные списки не трогаем
+            cursor.executemany(
+                "DELETE FROM pass_scores WHERE program = ? AND list_date = ? AND pass_score IS NULL",
+                affected
+            )
+            cursor.executemany(
+                "DELETE FROM statistics WHERE program = ? AND list_date = ?", affected
+            )
             
             conn.commit()
-            conn.close()
+            self.data_generation += 1
             
             return deleted_count
             
         except Exception as e:
+            self.get_connection().rollback()
             print(f"Ошибка при удалении по фильтрам: {e}")
             return 0
     
     def delete_by_program_and_date(self, program: str, date: str) -> int:
         """Удаление всех абитуриентов по программе и дате"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.get_connection()
             cursor = conn.cursor()
+            date = ListDate.to_key(date)
+            program = self._program_key(program)
             
-            cursor.execute(
-                "DELETE FROM applicants WHERE program = ? AND list_date = ?",
-                (program, date)
+            deleted_count = self._delete_applicants(
+                cursor, "program = ? AND list_date = ?", (program, date)
             )
             
-            deleted_count = cursor.rowcount
-            
             # Удаляем связанные записи
             cursor.execute(
                 "DELETE FROM pass_scores WHERE program = ? AND list_date = ?",
@@ -3606,37 +6334,37 @@ class EnhancedDatabaseWithDelete(EnhancedDatabase):
             )
             
             conn.commit()
-            conn.close()
+            self.data_generation += 1
             
             return deleted_count
             
         except Exception as e:
+            self.get_connection().rollback()
             print(f"Ошибка при удалении по программе и дате: {e}")
             return 0
     
     def delete_duplicate_applicants(self) -> int:
         """Удаление дубликатов абитуриентов"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.get_connection()
             cursor = conn.cursor()
             
             # Находим дубликаты (одинаковый external_id, program, list_date)
-            cursor.execute('''
-                DELETE FROM applicants 
-                WHERE id NOT IN (
+            where = '''
+                id NOT IN (
                     SELECT MIN(id) 
                     FROM applicants 
                     GROUP BY external_id, program, list_date
                 )
-            ''')
-            
-            deleted_count = cursor.rowcount
+            '''
+            deleted_count = self._delete_applicants(cursor, where)
             conn.commit()
-            conn.close()
+            self.data_generation += 1
             
             return deleted_count
             
         except Exception as e:
+            self.get_connection().rollback()
             print(f"Ошибка при удалении дубликатов: {e}")
             return 0
 
@@ -3970,25 +6698,29 @@ class DeleteApplicantsDialog(QDialog):
         # Получаем текущие фильтры из главного окна
         filters = self.parent().build_filter_conditions()
         
-        # Получаем абитуриентов по этим фильтрам
-        applicants = self.db.get_applicants_with_filters(filters)
+        # Получаем только первые 10 записей по этим фильтрам
+        applicants, _ = self.db.get_applicants_page(
+            filters, ('id', 'external_id', 'program', 'list_date', 'total_score'), limit=10
+        )
         
         if not applicants:
             self.filters_info.setPlainText("По текущим фильтрам не найдено абитуриентов.")
             return
         
+        total = self.db.count_applicants(filters)
+        
         # Формируем информацию
-        info = f"Найдено абитуриентов для удаления: {len(applicants)}\n\n"
+        info = f"Найдено абитуриентов для удаления: {total}\n\n"
         info += "Примеры записей, которые будут удалены:\n"
         info += "-" * 60 + "\n"
         
-        for i, app in enumerate(applicants[:10]):  # Показываем первые 10
+        for i, app in enumerate(applicants):  # Показываем первые 10
             info += f"{i+1}. ID: {app['id']}, Внешний ID: {app['external_id']}, "
             info += f"Программа: {app['program']}, Дата: {app['list_date']}, "
             info += f"Балл: {app['total_score']}\n"
         
-        if len(applicants) > 10:
-            info += f"... и еще {len(applicants) - 10} записей\n"
+        if total > 10:
+            info += f"... и еще {total - 10} записей\n"
         
         info += "\n" + "-" * 60 + "\n"
         info += "Будьте осторожны! Это действие нельзя отменить."
@@ -4013,10 +6745,10 @@ class DeleteApplicantsDialog(QDialog):
             )
         else:
             # Получаем количество абитуриентов для удаления
-            applicants = self.db.get_applicants_with_filters(filters)
+            total = self.db.count_applicants(filters)
             reply = QMessageBox.question(
                 self, "Подтверждение",
-                f"Вы уверены, что хотите удалить {len(applicants)} абитуриентов?\n"
+                f"Вы уверены, что хотите удалить {total} абитуриентов?\n"
                 "Это действие нельзя отменить.",
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
             )
@@ -4083,11 +6815,8 @@ class DeleteApplicantsDialog(QDialog):
     def delete_without_consent(self):
         """Удаление абитуриентов без согласия"""
         # Получаем количество абитуриентов без согласия
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM applicants WHERE consent = 0")
-        count = cursor.fetchone()[0]
-        conn.close()
+        filters = [FilterCondition("consent", "=", 0, LogicOperator.AND)]
+        count = self.db.count_applicants(filters)
         
         if count == 0:
             QMessageBox.information(self, "Информация", "Нет абитуриентов без согласия")
@@ -4100,7 +6829,6 @@ class DeleteApplicantsDialog(QDialog):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            filters = [FilterCondition("consent", "=", 0, LogicOperator.AND)]
             deleted_count = self.db.delete_applicants_by_filters(filters)
             QMessageBox.information(self, "Успех", f"Удалено {deleted_count} абитуриентов без согласия")
             self.update_stats()
@@ -4114,11 +6842,8 @@ class DeleteApplicantsDialog(QDialog):
         max_score = self.low_score_input.value()
         
         # Получаем количество абитуриентов с баллами ниже указанного
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM applicants WHERE total_score < ?", (max_score,))
-        count = cursor.fetchone()[0]
-        conn.close()
+        filters = [FilterCondition("total_score", "<", max_score, LogicOperator.AND)]
+        count = self.db.count_applicants(filters)
         
         if count == 0:
             QMessageBox.information(
@@ -4134,7 +6859,6 @@ class DeleteApplicantsDialog(QDialog):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            filters = [FilterCondition("total_score", "<", max_score, LogicOperator.AND)]
             deleted_count = self.db.delete_applicants_by_filters(filters)
             QMessageBox.information(
                 self, "Успех",
@@ -4148,74 +6872,58 @@ class DeleteApplicantsDialog(QDialog):
     
     def update_stats(self):
         """Обновление статистики базы данных"""
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        
         stats = "СТАТИСТИКА БАЗЫ ДАННЫХ\n"
         stats += "=" * 40 + "\n\n"
         
+        # Все показатели - из одной сводки
+        summary = self.db.summarize_applicants()
+        total = summary['total']
+        
         # Общее количество абитуриентов
-        cursor.execute("SELECT COUNT(*) FROM applicants")
-        total_applicants = cursor.fetchone()[0]
-        stats += f"Всего абитуриентов: {total_applicants}\n"
+        stats += f"Всего абитуриентов: {total['count']}\n"
         
         # С согласием и без
-        cursor.execute("SELECT COUNT(*) FROM applicants WHERE consent = 1")
-        with_consent = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM applicants WHERE consent = 0")
-        without_consent = cursor.fetchone()[0]
+        with_consent = summary['consent'].get(1, {}).get('count', 0)
+        without_consent = summary['consent'].get(0, {}).get('count', 0)
         stats += f"  • С согласием: {with_consent}\n"
         stats += f"  • Без согласия: {without_consent}\n\n"
         
         # По программам
         stats += "По программам:\n"
         for program in ['ПМ', 'ИВТ', 'ИТСС', 'ИБ']:
-            cursor.execute("SELECT COUNT(*) FROM applicants WHERE program = ?", (program,))
-            count = cursor.fetchone()[0]
+            count = summary['program'].get(program, {}).get('count', 0)
             stats += f"  • {program}: {count}\n"
         
         stats += "\n"
         
         # По датам
-        cursor.execute("SELECT DISTINCT list_date FROM applicants ORDER BY list_date")
-        dates = [row[0] for row in cursor.fetchall()]
-        
-        if dates:
+        if summary['list_date']:
             stats += "По датам:\n"
-            for date in dates:
-                cursor.execute("SELECT COUNT(*) FROM applicants WHERE list_date = ?", (date,))
-                count = cursor.fetchone()[0]
-                stats += f"  • {date}: {count}\n"
+            for date, entry in summary['list_date'].items():
+                stats += f"  • {date}: {entry['count']}\n"
         
         stats += "\n"
         
         # Средний балл
-        cursor.execute("SELECT AVG(total_score) FROM applicants")
-        avg_score = cursor.fetchone()[0]
-        if avg_score:
-            stats += f"Средний балл: {avg_score:.2f}\n"
+        if total['mean']:
+            stats += f"Средний балл: {total['mean']:.2f}\n"
         
         # Минимальный и максимальный балл
-        cursor.execute("SELECT MIN(total_score), MAX(total_score) FROM applicants")
-        min_max = cursor.fetchone()
-        if min_max[0] is not None:
-            stats += f"Минимальный балл: {min_max[0]}\n"
-            stats += f"Максимальный балл: {min_max[1]}\n"
+        if total['min'] is not None:
+            stats += f"Минимальный балл: {total['min']}\n"
+            stats += f"Максимальный балл: {total['max']}\n"
         
-        conn.close()
         
         self.stats_text.setPlainText(stats)
 
 # РАСШИРЕННЫЙ КЛАСС ГЛАВНОГО ОКНА С ФУНКЦИОНАЛОМ УДАЛЕНИЯ
 class ExtendedMainWindowWithDelete(ExtendedMainWindow):
+    # База данных с функциями удаления
+    DATABASE_CLASS = EnhancedDatabaseWithDelete
+    
     def __init__(self):
-        # Используем новую базу данных с функциями удаления
-        self.db = EnhancedDatabaseWithDelete()
         super().__init__()
         
-        # Заменяем базу данных в родительском классе
-        self.db = EnhancedDatabaseWithDelete()
-        
         # Добавляем контекстное меню для таблицы
         self.setup_table_context_menu()
     
@@ -4247,8 +6955,8 @@ class ExtendedMainWindowWithDelete(ExtendedMainWindow):
     
     def setup_table_context_menu(self):
         """Настройка контекстного меню для таблицы"""
-        self.table_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.table_widget.customContextMenuRequested.connect(self.show_table_context_menu)
+        self.table_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.table_view.customContextMenuRequested.connect(self.show_table_context_menu)
     
     def show_table_context_menu(self, position):
         """Показать контекстное меню для таблицы"""
@@ -4262,31 +6970,27 @@ class ExtendedMainWindowWithDelete(ExtendedMainWindow):
         view_details_action = menu.addAction("Просмотреть детали")
         view_details_action.triggered.connect(self.view_applicant_details)
         
-        menu.exec(self.table_widget.viewport().mapToGlobal(position))
+        menu.exec(self.table_view.viewport().mapToGlobal(position))
     
     def delete_selected_applicant(self):
         """Удалить выбранного абитуриента из таблицы"""
-        current_row = self.table_widget.currentRow()
+        current_row = self.table_view.currentIndex().row()
         if current_row < 0:
             QMessageBox.warning(self, "Ошибка", "Выберите абитуриента для удаления")
             return
         
-        # Получаем ID из первой колонки
-        id_item = self.table_widget.item(current_row, 0)
-        if not id_item:
+        # Получаем строку из модели таблицы
+        values = self.applicants_model.row_values(current_row)
+        if not values:
             QMessageBox.warning(self, "Ошибка", "Не удалось получить ID абитуриента")
             return
         
-        applicant_id = int(id_item.text())
+        applicant_id = values[0]
         
         # Получаем информацию об абитуриенте для подтверждения
-        program_item = self.table_widget.item(current_row, 1)
-        date_item = self.table_widget.item(current_row, 2)
-        score_item = self.table_widget.item(current_row, 9)
-        
-        program = program_item.text() if program_item else "?"
-        date = date_item.text() if date_item else "?"
-        score = score_item.text() if score_item else "?"
+        program = self.applicants_model.display_text(current_row, 1)
+        date = self.applicants_model.display_text(current_row, 2)
+        score = self.applicants_model.display_text(current_row, 9)
         
         reply = QMessageBox.question(
             self, "Подтверждение удаления",
@@ -4310,7 +7014,7 @@ class ExtendedMainWindowWithDelete(ExtendedMainWindow):
     
     def view_applicant_details(self):
         """Просмотр детальной информации об абитуриенте"""
-        current_row = self.table_widget.currentRow()
+        current_row = self.table_view.currentIndex().row()
         if current_row < 0:
             QMessageBox.warning(self, "Ошибка", "Выберите абитуриента")
             return
@@ -4319,15 +7023,11 @@ class ExtendedMainWindowWithDelete(ExtendedMainWindow):
         details = "ДЕТАЛЬНАЯ ИНФОРМАЦИЯ ОБ АБИТУРИЕНТЕ\n"
         details += "=" * 50 + "\n\n"
         
-        headers = [
-            'ID', 'Программа', 'Дата', 'Согласие', 'Приоритет', 
-            'Физика/ИКТ', 'Русский', 'Математика', 'Достижения', 'Сумма', 'Внешний ID'
-        ]
+        headers = ApplicantsTableModel.HEADERS
         
-        for col in range(self.table_widget.columnCount()):
+        for col in range(self.applicants_model.columnCount()):
             header = headers[col] if col < len(headers) else f"Колонка {col+1}"
-            item = self.table_widget.item(current_row, col)
-            value = item.text() if item else "Нет данных"
+            value = self.applicants_model.display_text(current_row, col) or "Нет данных"
             details += f"{header}: {value}\n"
         
         # Показываем диалог с деталями
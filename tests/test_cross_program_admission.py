@@ -0,0 +1,86 @@
+"""Проверка устойчивости распределения CrossProgramAdmission"""
+import random
+
+import numpy as np
+import pytest
+
+from main import CrossProgramAdmission, PassScoreCalculator
+
+PROGRAMS = ['ПМ', 'ИВТ', 'ИТСС', 'ИБ']
+
+
+def random_instance(rng, case):
+    """Заявления (external_id, program, priority, total_score) и места по программам"""
+    places = {program: rng.randint(0, 15) for program in PROGRAMS}
+    applications = []
+    for external_id in range(rng.randint(0, 120)):
+        programs = rng.sample(PROGRAMS, rng.randint(1, 4))
+        base = rng.randint(150, 160)
+        for priority, program in enumerate(programs, start=1):
+            # В каждом втором случае у абитуриента один балл на все программы
+            score = base if case % 2 else rng.randint(150, 160)
+            applications.append((external_id, program, priority, score))
+    return applications, places
+
+
+def assignment(admitted):
+    """external_id -> (программа, приоритет) по результату assign"""
+    result = {}
+    for program, heap in admitted.items():
+        for _, _, external_id, priority in heap:
+            assert external_id not in result
+            result[external_id] = (program, priority)
+    return result
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_assignment_is_stable(seed):
+    rng = random.Random(seed)
+    for case in range(100):
+        applications, places = random_instance(rng, case)
+        admitted = CrossProgramAdmission.assign(applications, places)
+        assigned = assignment(admitted)
+        
+        for program, heap in admitted.items():
+            assert len(heap) <= places[program]
+        
+        preferences = {}
+        for external_id, program, priority, score in applications:
+            preferences.setdefault(external_id, []).append((priority, program, score))
+        for external_id, choices in preferences.items():
+            current = assigned.get(external_id)
+            for priority, program, score in sorted(choices):
+                if current is not None and priority >= current[1]:
+                    break
+                if places[program] <= 0:
+                    continue
+                # Программа выше по приоритету заполнена, и все зачисленные на нее
+                # проходят выше абитуриента - иначе пара блокирующая
+                heap = admitted[program]
+                assert len(heap) == places[program]
+                assert min(heap) > (score, -external_id, external_id, priority)
+
+
+def test_assignment_does_not_depend_on_input_order():
+    rng = random.Random(11)
+    for case in range(50):
+        applications, places = random_instance(rng, case)
+        expected = assignment(CrossProgramAdmission.assign(applications, places))
+        rng.shuffle(applications)
+        assert assignment(CrossProgramAdmission.assign(applications, places)) == expected
+
+
+def test_single_program_matches_independent_mode():
+    # Без заявлений на несколько программ зачисление совпадает с независимым расчетом
+    rng = np.random.default_rng(5)
+    for case in range(200):
+        places = int(rng.integers(1, 40))
+        totals = rng.integers(150, 160 if case % 2 else 300, int(rng.integers(0, 80)))
+        applications = [
+            (external_id, 'ПМ', 1, int(total)) for external_id, total in enumerate(totals)
+        ]
+        heap = CrossProgramAdmission.assign(applications, {'ПМ': places})['ПМ']
+        
+        expected = PassScoreCalculator.numpy(np.ones(len(totals), dtype=np.int64), totals, places)
+        pass_score = heap[0][0] if len(heap) == places else None
+        assert pass_score == expected.pass_score
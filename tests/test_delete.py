@@ -0,0 +1,53 @@
+"""Удаление абитуриентов и связанные результаты расчета"""
+from main import EnhancedDatabaseWithDelete, FilterCondition, ListDate
+
+HEADER = "id,consent,priority,physics_score,russian_score,math_score,achievements_score,total_score"
+
+
+def write_list(path, count):
+    # Все с согласием и первым приоритетом: баллы 150..150+count-1
+    rows = [f"{100000 + i},True,1,50,50,{50 + i % 50},0,{150 + i % 50}" for i in range(count)]
+    path.write_text("\n".join([HEADER] + rows) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_delete_by_filters_touches_only_affected_lists(tmp_path):
+    db = EnhancedDatabaseWithDelete(str(tmp_path / "admission.db"))
+    # 01.08 ИБ не заполнена (10 из 20 мест), 02.08 ПМ заполнена (60 на 40 мест)
+    db.load_csv_bulk(write_list(tmp_path / "01.08_ИБ.csv", 10), "01.08")
+    db.load_csv_bulk(write_list(tmp_path / "02.08_ПМ.csv", 60), "02.08")
+    db.calculate_pass_scores(programs=['ИБ', 'ПМ'])
+    cursor = db.get_connection().cursor()
+    cursor.execute("SELECT COUNT(*) FROM statistics")
+    assert cursor.fetchone()[0] == 1
+    
+    # После удаления ПМ за 02.08 становится недобор
+    deleted = db.delete_applicants_by_filters([
+        FilterCondition("program", "=", "ПМ"), FilterCondition("total_score", ">", 160)
+    ])
+    assert deleted > 20
+    
+    # Отметка недобора ИБ за 01.08 не удалена и не пересчитывается
+    stored = db.stored_fingerprints()
+    fingerprints = db.list_fingerprints(programs=['ИБ', 'ПМ'])
+    stale = [key for key, value in fingerprints.items() if stored.get(key) != value]
+    assert stale == [(ListDate.to_key("02.08"), db._program_key("ПМ"))]
+    
+    assert db.calculate_pass_scores(['02.08'], ['ПМ'], only_changed=True) == {'02.08': {'ПМ': None}}
+    cursor.execute("SELECT COUNT(*) FROM statistics")
+    assert cursor.fetchone()[0] == 0
+    db.close()
+
+
+def test_underfilled_recalculation_clears_statistics(tmp_path):
+    db = EnhancedDatabaseWithDelete(str(tmp_path / "admission.db"))
+    db.load_csv_bulk(write_list(tmp_path / "02.08_ПМ.csv", 60), "02.08")
+    assert db.calculate_pass_scores(programs=['ПМ'])['02.08']['ПМ'] is not None
+    
+    # Новая версия списка короче числа мест
+    db.load_csv_bulk(write_list(tmp_path / "02.08_ПМ.csv", 30), "02.08")
+    assert db.calculate_pass_scores(programs=['ПМ'], only_changed=True) == {'02.08': {'ПМ': None}}
+    cursor = db.get_connection().cursor()
+    cursor.execute("SELECT COUNT(*) FROM statistics")
+    assert cursor.fetchone()[0] == 0
+    db.close()
@@ -0,0 +1,71 @@
+"""Загрузка конкурсных списков: проверка строк и карантин"""
+import pytest
+
+from main import EnhancedDatabase
+
+HEADER = "id,consent,priority,physics_score,russian_score,math_score,achievements_score,total_score"
+
+
+def write_list(path, rows):
+    path.write_text("\n".join([HEADER] + rows) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = EnhancedDatabase(str(tmp_path / "admission.db"))
+    yield database
+    database.close()
+
+
+@pytest.mark.parametrize("loader", ["load_csv_bulk", "load_csv", "load_date_files"])
+def test_blank_score_cell_is_quarantined(db, tmp_path, loader):
+    filepath = write_list(tmp_path / "02.08_ПМ.csv", [
+        "1,True,1,80,70,60,5,215",
+        "2,True,1,,70,60,5,135",
+        "3,False,2,50,50,50,0,150",
+    ])
+    if loader == "load_date_files":
+        [result] = db.load_date_files([filepath], "02.08")
+        assert result.success
+    elif loader == "load_csv":
+        assert db.load_csv(filepath, "02.08")
+    else:
+        assert db.load_csv_bulk(filepath, "02.08").success
+    
+    rows = db.get_applicants_with_filters()
+    assert sorted(row['external_id'] for row in rows) == [1, 3]
+    [quarantined] = db.get_quarantine()
+    assert quarantined['row'] == 3
+    assert quarantined['rule'] == "type"
+    assert quarantined['raw'] == "2,True,1,,70,60,5,135"
+
+
+@pytest.mark.parametrize("loader", ["load_csv_bulk", "load_csv_stream"])
+def test_duplicate_id_last_row_wins(db, tmp_path, loader):
+    # При chunk_rows=2 повтор id 1 попадает в другую часть файла
+    filepath = write_list(tmp_path / "02.08_ПМ.csv", [
+        "1,True,1,80,70,60,5,215",
+        "2,True,1,50,50,50,0,150",
+        "3,False,2,50,50,50,0,150",
+        "1,False,3,70,70,70,0,210",
+        "4,True,1,60,60,60,0,180",
+    ])
+    if loader == "load_csv_stream":
+        result = db.load_csv_stream(filepath, "02.08", chunk_rows=2)
+    else:
+        result = db.load_csv_bulk(filepath, "02.08")
+    assert result.success
+    assert result.loaded == 4
+    
+    rows = {row['external_id']: row for row in db.get_applicants_with_filters()}
+    assert sorted(rows) == [1, 2, 3, 4]
+    assert rows[1]['total_score'] == 210
+    [quarantined] = db.get_quarantine()
+    assert quarantined['row'] == 2
+    assert quarantined['rule'] == "duplicate"
+    assert quarantined['raw'] == "1,True,1,80,70,60,5,215"
+    row_count, rejected_count = db.get_connection().execute(
+        "SELECT row_count, rejected_count FROM ingest_manifest"
+    ).fetchone()
+    assert (row_count, rejected_count) == (4, 1)
@@ -0,0 +1,97 @@
+"""Сверка PassScoreCalculator с исходным алгоритмом расчета проходного балла"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import EnhancedDatabase, PassScoreCalculator
+
+
+def reference_pass_score(applicants, places):
+    """Исходный EnhancedDatabase.calculate_pass_score (до выделения движков)"""
+    # Исходный код падал с IndexError при нуле мест; движки возвращают None
+    if not applicants or places <= 0:
+        return None
+    
+    applicants = sorted(applicants, key=lambda x: (x['priority'], -x['total_score']))
+    
+    admitted = []
+    current_priority = 1
+    
+    while current_priority <= 4 and len(admitted) < places:
+        priority_applicants = [a for a in applicants if a['priority'] == current_priority]
+        priority_applicants.sort(key=lambda x: -x['total_score'])
+        
+        for applicant in priority_applicants:
+            if len(admitted) < places:
+                admitted.append(applicant)
+            else:
+                break
+        current_priority += 1
+    
+    if len(admitted) < places:
+        return None
+    
+    priority_counts = [len([a for a in applicants if a['priority'] == i]) for i in range(1, 5)]
+    admitted_counts = [len([a for a in admitted if a['priority'] == i]) for i in range(1, 5)]
+    return admitted[-1]['total_score'], priority_counts, admitted_counts
+
+
+def random_case(rng, case):
+    """Случайный список: короткие списки, нулевые места и много равных баллов"""
+    count = int(rng.integers(0, 200))
+    places = int(rng.integers(0, 60))
+    priorities = rng.integers(1, 5, count)
+    # В каждом втором случае баллы из узкого диапазона - почти все равны
+    totals = rng.integers(150, 160 if case % 2 else 300, count)
+    return priorities, totals, places
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_engines_match_reference(seed):
+    rng = np.random.default_rng(seed)
+    for case in range(1000):
+        priorities, totals, places = random_case(rng, case)
+        applicants = [
+            {'priority': int(priority), 'total_score': int(total)}
+            for priority, total in zip(priorities, totals)
+        ]
+        expected = reference_pass_score(applicants, places)
+        
+        for result in (PassScoreCalculator.python(applicants, places),
+                       PassScoreCalculator.numpy(priorities, totals, places)):
+            assert result.total_applications == len(applicants)
+            if expected is None:
+                assert result.pass_score is None
+            else:
+                assert (result.pass_score, result.priority_counts, result.admitted_counts) == expected
+
+
+def test_database_engines_match_reference(tmp_path):
+    rng = np.random.default_rng(7)
+    db = EnhancedDatabase(str(tmp_path / "admission.db"))
+    lists = {}
+    for program in EnhancedDatabase.PROGRAM_PLACES:
+        count = int(rng.integers(10, 120))
+        frame = pd.DataFrame({
+            'id': rng.choice(10 ** 6, count, replace=False),
+            'consent': rng.random(count) < 0.6,
+            'priority': rng.integers(1, 5, count),
+            'physics_score': rng.integers(40, 101, count),
+            'russian_score': rng.integers(40, 101, count),
+            'math_score': rng.integers(40, 101, count),
+            'achievements_score': rng.integers(0, 11, count),
+        })
+        frame['total_score'] = frame[['physics_score', 'russian_score', 'math_score',
+                                      'achievements_score']].sum(axis=1)
+        filepath = tmp_path / f"02.08_{program}.csv"
+        frame.to_csv(filepath, index=False)
+        assert db.load_csv_bulk(str(filepath), "02.08").success
+        lists[program] = frame[frame['consent']]
+    
+    for program, frame in lists.items():
+        applicants = frame[['priority', 'total_score']].to_dict('records')
+        expected = reference_pass_score(applicants, EnhancedDatabase.PROGRAM_PLACES[program])
+        expected_score = expected[0] if expected else None
+        for engine in EnhancedDatabase.PASS_SCORE_ENGINES:
+            assert db.calculate_pass_score(program, "02.08", engine) == expected_score
+    db.close()